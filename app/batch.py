@@ -0,0 +1,113 @@
+import os, time, asyncio, logging
+from typing import Dict, List, Any, Optional, Tuple
+from dotenv import load_dotenv
+from openai import RateLimitError
+from pymongo.errors import BulkWriteError
+
+from .db import paths
+from .catalog_index import catalog_index
+from .generation import plan_for, build_path_doc, PlanError
+from .planner import plan_locally
+from .plan_cache import plan_key
+from .models import GenerateRequest
+
+load_dotenv()
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_RATE_LIMIT_RETRIES = int(os.getenv("BATCH_RATE_LIMIT_RETRIES", "3"))
+BATCH_RATE_LIMIT_BACKOFF = float(os.getenv("BATCH_RATE_LIMIT_BACKOFF", "2"))
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _RateLimitGate:
+    """Pauses every batch worker once one of them is rate limited."""
+
+    def __init__(self):
+        self.until = 0.0
+
+    async def wait(self) -> None:
+        delay = self.until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close_for(self, seconds: float) -> None:
+        self.until = max(self.until, time.monotonic() + seconds)
+
+
+async def _plan_with_backoff(body: GenerateRequest, gate: _RateLimitGate, limit: asyncio.Semaphore) -> Dict[str, Any]:
+    if body.planner == "local":
+        return plan_locally(body.desiredSkills, body.desiredTopics, catalog_index)
+
+    async with limit:
+        for attempt in range(BATCH_RATE_LIMIT_RETRIES + 1):
+            await gate.wait()
+            try:
+                # rate limits are retried here; "auto" only falls back once they are used up
+                return await plan_for(body.desiredSkills, body.desiredTopics, "llm")
+            except PlanError as e:
+                if not isinstance(e.__cause__, RateLimitError) or attempt == BATCH_RATE_LIMIT_RETRIES:
+                    if body.planner != "auto":
+                        raise
+                    logger.warning("batch LLM planning failed, using the local planner: %s", e)
+                    return plan_locally(body.desiredSkills, body.desiredTopics, catalog_index)
+                delay = _retry_after(e.__cause__)
+                if delay is None:
+                    delay = BATCH_RATE_LIMIT_BACKOFF * (2 ** attempt)
+                logger.info("batch generation rate limited, pausing %.1fs", delay)
+                gate.close_for(delay)
+
+
+async def generate_batch(items: List[GenerateRequest]) -> List[Dict[str, Any]]:
+    """Plans every distinct goal set once and inserts all paths with one insert_many.
+
+    Expects the catalog to be loaded. Returns one result per input item, in order.
+    """
+    gate = _RateLimitGate()
+    limit = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for idx, body in enumerate(items):
+        key = (plan_key(body.desiredSkills, body.desiredTopics, catalog_index.version), body.planner)
+        groups.setdefault(key, []).append(idx)
+
+    keys = list(groups)
+    plans = await asyncio.gather(
+        *(_plan_with_backoff(items[groups[key][0]], gate, limit) for key in keys),
+        return_exceptions=True
+    )
+
+    results: List[Dict[str, Any]] = [{"index": idx, "ok": False} for idx in range(len(items))]
+    docs: List[Dict[str, Any]] = []
+    doc_items: List[int] = []
+    for key, plan in zip(keys, plans):
+        for idx in groups[key]:
+            if isinstance(plan, BaseException):
+                results[idx]["error"] = f"OpenAI error: {plan}"
+                continue
+            docs.append(build_path_doc(items[idx], plan))
+            doc_items.append(idx)
+
+    failed_inserts: Dict[int, str] = {}
+    if docs:
+        try:
+            await paths.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed_inserts[error["index"]] = error.get("errmsg", "write failed")
+
+    for position, (idx, doc) in enumerate(zip(doc_items, docs)):
+        if position in failed_inserts:
+            results[idx]["error"] = f"Mongo error: {failed_inserts[position]}"
+        else:
+            results[idx].update({"ok": True, "pathId": doc["pathId"]})
+
+    return results
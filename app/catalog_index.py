@@ -0,0 +1,317 @@
+import os, re, json, heapq, asyncio, hashlib
+from collections import defaultdict
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# words that show up in most catalog names and say nothing about the goal
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "in", "on", "to", "for", "with",
+    "basics", "fundamentals", "intro", "introduction", "foundations"
+}
+# on large catalogs, terms found in more than this share of items are
+# dropped from the postings, they don't discriminate
+COMMON_TERM_SHARE = 0.2
+COMMON_TERM_MIN_ITEMS = 1000
+# longer postings are cut to the best ranked ids, so a lookup walks at most
+# this many ids per term whatever the catalog size
+POSTINGS_PER_TERM = int(os.getenv("CATALOG_POSTINGS_PER_TERM", "500"))
+FINGERPRINT_MODULUS = 2 ** 160
+
+# what a rebuild of one catalog replaces, swapped in together by refresh()
+_PARTS = {
+    "topics": ("topics", "topics_by_id", "topic_postings", "topic_parent", "topic_children"),
+    "skills": ("skills", "skills_by_id", "skill_postings", "skill_topic", "skills_by_topic"),
+    "resources": ("resources", "resources_by_id", "resource_title_postings", "resource_description_postings"),
+}
+_PRUNED = {"topics": ("topic",), "skills": ("skill",), "resources": ("resource_title", "resource_description")}
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    if not text:
+        return set()
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in STOPWORDS}
+
+
+def skill_name(skill: Dict[str, Any]) -> Optional[str]:
+    return skill.get("skill") or skill.get("name")
+
+
+def skill_topic_id(skill: Dict[str, Any]) -> Optional[str]:
+    return skill.get("topicID") or skill.get("topicId") or skill.get("topic_id")
+
+
+def topic_parent_id(topic: Dict[str, Any]) -> Optional[str]:
+    return topic.get("parentId") or topic.get("parentID") or topic.get("parent_id")
+
+
+def _ranked_ids(entries: List[Tuple[int, Any]]) -> List[Any]:
+    # items with fewer terms are more about the term, ties keep catalog order
+    if len(entries) > POSTINGS_PER_TERM:
+        entries = heapq.nsmallest(POSTINGS_PER_TERM, entries, key=lambda entry: entry[0])
+    return [item_id for _, item_id in entries]
+
+
+def _postings(items: List[Dict[str, Any]], text) -> Tuple[Dict[str, List[Any]], Set[str]]:
+    """Returns the postings and the common terms that were pruned from them."""
+    postings: Dict[str, List[Tuple[int, Any]]] = defaultdict(list)
+    for item in items:
+        terms = tokenize(text(item))
+        for term in terms:
+            postings[term].append((len(terms), item.get("id")))
+
+    pruned: Set[str] = set()
+    if len(items) >= COMMON_TERM_MIN_ITEMS:
+        limit = len(items) * COMMON_TERM_SHARE
+        pruned = {term for term, entries in postings.items() if len(entries) > limit}
+    return {term: _ranked_ids(entries) for term, entries in postings.items() if term not in pruned}, pruned
+
+
+def _post(postings: Dict[str, List[Any]], pruned: Set[str], item_id: Any, text: Optional[str]) -> None:
+    for term in tokenize(text):
+        ids = postings.setdefault(term, []) if term not in pruned else None
+        if ids is not None and len(ids) < POSTINGS_PER_TERM:
+            ids.append(item_id)
+
+
+def _unpost(postings: Dict[str, List[Any]], item_id: Any, text: Optional[str]) -> None:
+    for term in tokenize(text):
+        ids = postings.get(term)
+        if ids is not None and item_id in ids:
+            ids.remove(item_id)
+            if not ids:
+                del postings[term]
+
+
+def _digest(item: Dict[str, Any]) -> int:
+    raw = json.dumps(item, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.sha1(raw).digest(), "big")
+
+
+def _sum_digests(items: List[Dict[str, Any]]) -> int:
+    # a sum of per-item digests rather than one running hash, so a patch
+    # can subtract the old item and add the new one
+    return sum(_digest(item) for item in items) % FINGERPRINT_MODULUS
+
+
+class CatalogIndex:
+    """Lookup structures over the upstream catalogs.
+
+    `update()` only rebuilds the part whose list changed. The catalog cache
+    hands out the same list object until it reloads, so an identity check is
+    enough to tell which catalog was refreshed. Lists that are patched in
+    place by an incremental sync are followed with `patch()` instead.
+    On the event loop, use `refresh()`, which rebuilds in a worker thread.
+    """
+
+    def __init__(self):
+        self.topics: List[Dict[str, Any]] = []
+        self.skills: List[Dict[str, Any]] = []
+        self.resources: List[Dict[str, Any]] = []
+
+        self.topics_by_id: Dict[Any, Dict[str, Any]] = {}
+        self.topic_postings: Dict[str, List[Any]] = {}
+        self.topic_parent: Dict[Any, Any] = {}
+        self.topic_children: Dict[Any, List[Any]] = {}
+
+        self.skills_by_id: Dict[Any, Dict[str, Any]] = {}
+        self.skill_postings: Dict[str, List[Any]] = {}
+        self.skill_topic: Dict[Any, Any] = {}
+        self.skills_by_topic: Dict[Any, List[Any]] = {}
+
+        self.resources_by_id: Dict[Any, Dict[str, Any]] = {}
+        self.resource_title_postings: Dict[str, List[Any]] = {}
+        self.resource_description_postings: Dict[str, List[Any]] = {}
+
+        self.versions: Dict[str, str] = {"topics": "", "skills": "", "resources": ""}
+        self._sums: Dict[str, int] = {"topics": 0, "skills": 0, "resources": 0}
+        self.pruned: Dict[str, Set[str]] = {"topic": set(), "skill": set(), "resource_title": set(), "resource_description": set()}
+        self._lock: Optional[asyncio.Lock] = None
+
+    def update(
+        self,
+        topics: Optional[List[Dict[str, Any]]] = None,
+        skills: Optional[List[Dict[str, Any]]] = None,
+        resources: Optional[List[Dict[str, Any]]] = None) -> "CatalogIndex":
+
+        if topics is not None and topics is not self.topics:
+            self._index_topics(topics)
+        if skills is not None and skills is not self.skills:
+            self._index_skills(skills)
+        if resources is not None and resources is not self.resources:
+            self._index_resources(resources)
+        return self
+
+    async def refresh(
+        self,
+        catalog: Dict[str, List[Dict[str, Any]]],
+        drain: Optional[Callable[[], Dict[str, List[Dict[str, Any]]]]] = None) -> "CatalogIndex":
+        """`update()` for the event loop.
+
+        Changed catalogs are indexed from a copy of their list in a worker
+        thread and swapped in without an await in between, so requests see
+        either the old or the new index, never a mix. The changes returned by
+        `drain` (see `patch()`) are applied afterwards. Refreshes run one at a
+        time, so a patch never lands on structures a running rebuild replaces.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            stale = {kind: items for kind, items in catalog.items() if items is not getattr(self, kind)}
+            if stale:
+                fresh = await asyncio.to_thread(CatalogIndex().update, **{kind: list(items) for kind, items in stale.items()})
+                for kind, items in stale.items():
+                    self._adopt(fresh, kind, items)
+            for kind, changes in (drain() if drain else {}).items():
+                if changes:
+                    self.patch(kind, changes)
+        return self
+
+    def _adopt(self, fresh: "CatalogIndex", kind: str, items: List[Dict[str, Any]]) -> None:
+        for name in _PARTS[kind]:
+            setattr(self, name, getattr(fresh, name))
+        for name in _PRUNED[kind]:
+            self.pruned[name] = fresh.pruned[name]
+        self._set_version(kind, fresh._sums[kind])
+        # the original list, so the identity check sees it as indexed
+        setattr(self, kind, items)
+
+    @property
+    def version(self) -> str:
+        combined = ":".join(self.versions[name] for name in ("topics", "skills", "resources"))
+        return hashlib.sha1(combined.encode("utf-8")).hexdigest()
+
+    def _index_topics(self, topics: List[Dict[str, Any]]) -> None:
+        parent: Dict[Any, Any] = {}
+        children: Dict[Any, List[Any]] = defaultdict(list)
+        for topic in topics:
+            parent_id = topic_parent_id(topic)
+            if parent_id is not None:
+                parent[topic.get("id")] = parent_id
+                children[parent_id].append(topic.get("id"))
+
+        self.topics_by_id = {topic.get("id"): topic for topic in topics}
+        self.topic_postings, self.pruned["topic"] = _postings(topics, lambda topic: topic.get("name"))
+        self.topic_parent = parent
+        self.topic_children = dict(children)
+        self._set_version("topics", _sum_digests(topics))
+        self.topics = topics
+
+    def _index_skills(self, skills: List[Dict[str, Any]]) -> None:
+        skill_topic: Dict[Any, Any] = {}
+        by_topic: Dict[Any, List[Any]] = defaultdict(list)
+        for skill in skills:
+            topic_id = skill_topic_id(skill)
+            if topic_id is not None:
+                skill_topic[skill.get("id")] = topic_id
+                by_topic[topic_id].append(skill.get("id"))
+
+        self.skills_by_id = {skill.get("id"): skill for skill in skills}
+        self.skill_postings, self.pruned["skill"] = _postings(skills, skill_name)
+        self.skill_topic = skill_topic
+        self.skills_by_topic = dict(by_topic)
+        self._set_version("skills", _sum_digests(skills))
+        self.skills = skills
+
+    def _index_resources(self, resources: List[Dict[str, Any]]) -> None:
+        self.resources_by_id = {resource.get("id"): resource for resource in resources}
+        self.resource_title_postings, self.pruned["resource_title"] = _postings(
+            resources, lambda resource: resource.get("title"))
+        self.resource_description_postings, self.pruned["resource_description"] = _postings(
+            resources, lambda resource: resource.get("description"))
+        self._set_version("resources", _sum_digests(resources))
+        self.resources = resources
+
+    def _set_version(self, kind: str, total: int) -> None:
+        self._sums[kind] = total % FINGERPRINT_MODULUS
+        self.versions[kind] = f"{self._sums[kind]:040x}"
+
+    def patch(self, kind: str, changes: List[Dict[str, Any]]) -> "CatalogIndex":
+        """Applies changed items of one catalog ("topics", "skills" or
+        "resources") without a rebuild; items with "deleted": true are removed.
+
+        The catalog list itself is patched by its owner, only the lookup
+        structures and the version are updated here. Applying a change that
+        is already indexed leaves the index as it is. Terms that grow common
+        through patches are only pruned at the next full rebuild, and items
+        added under a term whose postings are full only show up there after it.
+        """
+        by_id = {"topics": self.topics_by_id, "skills": self.skills_by_id, "resources": self.resources_by_id}[kind]
+        add = {"topics": self._add_topic, "skills": self._add_skill, "resources": self._add_resource}[kind]
+        remove = {"topics": self._remove_topic, "skills": self._remove_skill, "resources": self._remove_resource}[kind]
+
+        total = self._sums[kind]
+        for item in changes:
+            old = by_id.get(item.get("id"))
+            if old is not None:
+                remove(old)
+                total -= _digest(old)
+            if not item.get("deleted"):
+                add(item)
+                total += _digest(item)
+        self._set_version(kind, total)
+        return self
+
+    def _add_topic(self, topic: Dict[str, Any]) -> None:
+        topic_id, parent_id = topic.get("id"), topic_parent_id(topic)
+        self.topics_by_id[topic_id] = topic
+        _post(self.topic_postings, self.pruned["topic"], topic_id, topic.get("name"))
+        if parent_id is not None:
+            self.topic_parent[topic_id] = parent_id
+            self.topic_children.setdefault(parent_id, []).append(topic_id)
+
+    def _remove_topic(self, topic: Dict[str, Any]) -> None:
+        topic_id = topic.get("id")
+        self.topics_by_id.pop(topic_id, None)
+        _unpost(self.topic_postings, topic_id, topic.get("name"))
+        parent_id = self.topic_parent.pop(topic_id, None)
+        siblings = self.topic_children.get(parent_id)
+        if siblings and topic_id in siblings:
+            siblings.remove(topic_id)
+
+    def _add_skill(self, skill: Dict[str, Any]) -> None:
+        skill_id, topic_id = skill.get("id"), skill_topic_id(skill)
+        self.skills_by_id[skill_id] = skill
+        _post(self.skill_postings, self.pruned["skill"], skill_id, skill_name(skill))
+        if topic_id is not None:
+            self.skill_topic[skill_id] = topic_id
+            self.skills_by_topic.setdefault(topic_id, []).append(skill_id)
+
+    def _remove_skill(self, skill: Dict[str, Any]) -> None:
+        skill_id = skill.get("id")
+        self.skills_by_id.pop(skill_id, None)
+        _unpost(self.skill_postings, skill_id, skill_name(skill))
+        topic_id = self.skill_topic.pop(skill_id, None)
+        skills = self.skills_by_topic.get(topic_id)
+        if skills and skill_id in skills:
+            skills.remove(skill_id)
+
+    def _add_resource(self, resource: Dict[str, Any]) -> None:
+        resource_id = resource.get("id")
+        self.resources_by_id[resource_id] = resource
+        _post(self.resource_title_postings, self.pruned["resource_title"], resource_id, resource.get("title"))
+        _post(self.resource_description_postings, self.pruned["resource_description"], resource_id, resource.get("description"))
+
+    def _remove_resource(self, resource: Dict[str, Any]) -> None:
+        resource_id = resource.get("id")
+        self.resources_by_id.pop(resource_id, None)
+        _unpost(self.resource_title_postings, resource_id, resource.get("title"))
+        _unpost(self.resource_description_postings, resource_id, resource.get("description"))
+
+    def match(self, postings: Dict[str, List[Any]], terms: Set[str]) -> Dict[Any, int]:
+        counts: Dict[Any, int] = defaultdict(int)
+        for term in terms:
+            for item_id in postings.get(term, ()):
+                counts[item_id] += 1
+        return counts
+
+    def subtopics(self, topic_id: Any) -> List[Any]:
+        return self.topic_children.get(topic_id, [])
+
+    def parent_of(self, topic_id: Any) -> Optional[Any]:
+        return self.topic_parent.get(topic_id)
+
+
+catalog_index = CatalogIndex()
@@ -1,27 +1,291 @@
-import os
+import os, time, asyncio, operator
+from collections import OrderedDict
 from dotenv import load_dotenv
-from typing import List, Dict, Any
-from .helpers import get_json
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+from .helpers import get_json, get_json_conditional
+from .metrics import Histogram
 
 load_dotenv()
 
 TOPICS_API_BASE_URL = os.getenv("TOPICS_API_BASE_URL", "http://127.0.0.1:5000").rstrip("/")
 RESOURCES_API_BASE_URL = os.getenv("RESOURCES_API_BASE_URL", "http://localhost:5002").rstrip("/")
 
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_STALE_TTL = float(os.getenv("CATALOG_CACHE_STALE_TTL", "3600"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "16"))
+CATALOG_FETCH_DEADLINE = float(os.getenv("CATALOG_FETCH_DEADLINE", "10"))
+# "full" re-downloads every catalog on refresh, "etag" sends If-None-Match,
+# "delta" also asks only for items changed since the last seen updatedAt
+CATALOG_SYNC = os.getenv("CATALOG_SYNC", "full").strip().lower()
+CATALOG_DELTA_PARAM = os.getenv("CATALOG_DELTA_PARAM", "updatedSince")
+CATALOG_FULL_SYNC_INTERVAL = float(os.getenv("CATALOG_FULL_SYNC_INTERVAL", "3600"))
 
-def fetch_topics() -> List[Dict[str, Any]]:
-    return get_json(f"{TOPICS_API_BASE_URL}/topics")
+# includes catalog cache hits, which show up in the lowest buckets
+catalog_fetch_latency = Histogram("catalog_fetch_seconds", "Catalog fetch time per upstream", ["upstream", "outcome"])
 
 
-def fetch_skills() -> List[Dict[str, Any]]:
-    return get_json(f"{TOPICS_API_BASE_URL}/skills")
+async def fetch_topics() -> List[Dict[str, Any]]:
+    return await get_json(f"{TOPICS_API_BASE_URL}/topics")
 
 
-def fetch_resources() -> List[Dict[str, Any]]:
-    items = get_json(f"{RESOURCES_API_BASE_URL}/resources")
+async def fetch_skills() -> List[Dict[str, Any]]:
+    return await get_json(f"{TOPICS_API_BASE_URL}/skills")
+
+
+def _resource_id(item: Dict[str, Any]) -> Dict[str, Any]:
+    if "id" not in item and "_id" in item:
+        item["id"] = str(item["_id"])
+    return item
+
+
+async def fetch_resources() -> List[Dict[str, Any]]:
+    items = await get_json(f"{RESOURCES_API_BASE_URL}/resources")
 
     for item in items:
-        if "id" not in item and "_id" in item:
-            item["id"] = str(item["_id"])
-    
+        _resource_id(item)
+
     return items
+
+
+class CatalogSync:
+    """Local copy of one upstream catalog that refreshes in O(changes).
+
+    In "etag" mode a refresh is a conditional GET of the whole list and a 304
+    keeps the copy. In "delta" mode the request also carries the highest
+    updatedAt seen so far (CATALOG_DELTA_PARAM), and the returned items are
+    patched into the list in place; items with "deleted": true are removed.
+    Upstreams that ignore the parameter just send everything, which is still
+    correct. Deletions without a tombstone are picked up by a full fetch every
+    CATALOG_FULL_SYNC_INTERVAL seconds.
+
+    Items patched in since the last `drain()` are kept for CatalogIndex.patch.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        mode: str = CATALOG_SYNC,
+        normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        full_sync_interval: float = CATALOG_FULL_SYNC_INTERVAL):
+
+        self.url = url
+        self.mode = mode
+        self.normalize = normalize or (lambda item: item)
+        self.full_sync_interval = full_sync_interval
+        self.items: List[Dict[str, Any]] = []
+        self.positions: Dict[Any, int] = {}
+        self.etags: Dict[Optional[str], str] = {}
+        self.high_water: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.changes: List[Dict[str, Any]] = []
+
+    async def refresh(self) -> List[Dict[str, Any]]:
+        full = (self.mode != "delta" or self.synced_at is None or self.high_water is None
+                or time.monotonic() - self.synced_at >= self.full_sync_interval)
+        since = None if full else self.high_water
+
+        data, etag = await get_json_conditional(
+            self.url,
+            etag=self.etags.get(since),
+            params=None if since is None else {CATALOG_DELTA_PARAM: since})
+
+        if data is not None:
+            if full:
+                self._replace(data)
+            else:
+                self._patch(data)
+            if etag:
+                # only the full list and the newest delta URL can still match
+                self.etags = {key: value for key, value in self.etags.items() if key is None}
+                self.etags[since] = etag
+        if full:
+            self.synced_at = time.monotonic()
+        return self.items
+
+    def restore(self, items: List[Dict[str, Any]], etag: Optional[str] = None) -> None:
+        """Starts from a saved copy; the next refresh is a full, conditional fetch."""
+        self._replace(items)
+        self.etags = {None: etag} if etag else {}
+        self.synced_at = None
+
+    def drain(self) -> List[Dict[str, Any]]:
+        changes, self.changes = self.changes, []
+        return changes
+
+    def _track(self, item: Dict[str, Any]) -> None:
+        updated_at = item.get("updatedAt")
+        if updated_at is not None and (self.high_water is None or str(updated_at) > self.high_water):
+            self.high_water = str(updated_at)
+
+    def _replace(self, data: List[Dict[str, Any]]) -> None:
+        # a new list object, so the catalog index rebuilds instead of patching
+        self.items = [self.normalize(item) for item in data]
+        self.positions = {item.get("id"): idx for idx, item in enumerate(self.items)}
+        self.changes = []
+        self.high_water = None
+        for item in self.items:
+            self._track(item)
+
+    def _patch(self, data: List[Dict[str, Any]]) -> None:
+        for item in data:
+            item = self.normalize(item)
+            item_id = item.get("id")
+            position = self.positions.get(item_id)
+
+            if item.get("deleted"):
+                if position is not None:
+                    # swap with the last item so removal stays O(1)
+                    last = self.items.pop()
+                    if position < len(self.items):
+                        self.items[position] = last
+                        self.positions[last.get("id")] = position
+                    del self.positions[item_id]
+            elif position is not None:
+                self.items[position] = item
+            else:
+                self.positions[item_id] = len(self.items)
+                self.items.append(item)
+
+            self.changes.append(item)
+            self._track(item)
+
+
+class CatalogCache:
+    """TTL cache for upstream catalogs.
+
+    Entries younger than `ttl` are served as-is. Entries older than `ttl` but
+    younger than `stale_ttl` are served immediately while a background task
+    reloads them (stale-while-revalidate). Older entries are reloaded inline.
+    A reload that comes back equal to the cached value keeps the cached
+    object, so consumers that key on identity (the catalog index) see no
+    change. At most `max_entries` keys are kept, least recently used first out.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry["loadedAt"]
+            if age < self.ttl:
+                return entry["value"]
+            if age < self.stale_ttl:
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.create_task(self._refresh(key, loader))
+                return entry["value"]
+
+        value = await self._load(key, loader)
+        self._store(key, value)
+        return value
+
+    def seed(self, key: str, value: Any) -> None:
+        """Stores a value that is already due for revalidation, e.g. one restored from a snapshot."""
+        self._store(key, value)
+        self._entries[key]["loadedAt"] -= self.ttl
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        entry = self._entries.get(key)
+        # compared in a thread, a full catalog takes tens of milliseconds
+        if entry is not None and entry["value"] is not value and await asyncio.to_thread(operator.eq, entry["value"], value):
+            return entry["value"]
+        return value
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = {"value": value, "loadedAt": time.monotonic()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self._store(key, await self._load(key, loader))
+        except Exception:
+            # keep serving the stale value, the next stale hit retries
+            pass
+        finally:
+            self._refreshing.pop(key, None)
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_TTL, CATALOG_CACHE_STALE_TTL, CATALOG_CACHE_MAX_ENTRIES)
+
+
+catalog_syncs: Dict[str, CatalogSync] = {}
+if CATALOG_SYNC in {"etag", "delta"}:
+    catalog_syncs = {
+        "topics": CatalogSync(f"{TOPICS_API_BASE_URL}/topics"),
+        "skills": CatalogSync(f"{TOPICS_API_BASE_URL}/skills"),
+        "resources": CatalogSync(f"{RESOURCES_API_BASE_URL}/resources", normalize=_resource_id),
+    }
+
+
+def drain_catalog_changes() -> Dict[str, List[Dict[str, Any]]]:
+    return {name: sync.drain() for name, sync in catalog_syncs.items()}
+
+
+async def get_topics() -> List[Dict[str, Any]]:
+    loader = catalog_syncs["topics"].refresh if catalog_syncs else fetch_topics
+    return await catalog_cache.get(f"{TOPICS_API_BASE_URL}/topics", loader)
+
+
+async def get_skills() -> List[Dict[str, Any]]:
+    loader = catalog_syncs["skills"].refresh if catalog_syncs else fetch_skills
+    return await catalog_cache.get(f"{TOPICS_API_BASE_URL}/skills", loader)
+
+
+async def get_resources() -> List[Dict[str, Any]]:
+    loader = catalog_syncs["resources"].refresh if catalog_syncs else fetch_resources
+    return await catalog_cache.get(f"{RESOURCES_API_BASE_URL}/resources", loader)
+
+
+def invalidate_catalog(key: Optional[str] = None) -> None:
+    catalog_cache.invalidate(key)
+
+
+class UpstreamError(Exception):
+    def __init__(self, name: str, error: Exception):
+        super().__init__(f"{name}: {error}")
+        self.name = name
+        self.error = error
+
+
+async def _fetch_one(name: str, getter: Callable[[], Awaitable[Any]], deadline: float) -> Any:
+    outcome = "ok"
+    started = time.perf_counter()
+    try:
+        return await asyncio.wait_for(getter(), timeout=deadline)
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise UpstreamError(name, TimeoutError(f"no response within {deadline:g}s"))
+    except Exception as e:
+        outcome = "error"
+        raise UpstreamError(name, e)
+    finally:
+        catalog_fetch_latency.observe(time.perf_counter() - started, upstream=name, outcome=outcome)
+
+
+async def fetch_catalog(deadline: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+    deadline = CATALOG_FETCH_DEADLINE if deadline is None else deadline
+
+    topics, skills, resources = await asyncio.gather(
+        _fetch_one("topics", get_topics, deadline),
+        _fetch_one("skills", get_skills, deadline),
+        _fetch_one("resources", get_resources, deadline),
+    )
+
+    return {"topics": topics, "skills": skills, "resources": resources}
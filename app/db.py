@@ -1,16 +1,71 @@
-import os
+import os, logging
+from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from typing import Any, Dict, List, Set
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27077")
 MONGO_DB = os.getenv("MONGO_DB", "learning_paths")
 
-mongo = MongoClient(MONGO_URI)
+mongo = AsyncMongoClient(MONGO_URI)
 db = mongo[MONGO_DB]
 paths = db["learning_paths"]
+plan_cache = db["plan_cache"]
+catalog_snapshots = db["catalog_snapshots"]
 
-def ping() -> bool:
-    mongo.admin.command("ping")
+logger = logging.getLogger(__name__)
+
+# (name, filter, sort) of the queries on every request path; checked at startup
+HOT_QUERIES = [
+    ("get_path", {"pathId": "lp-plan-check"}, None),
+    ("list_paths_by_user", {"userId": "plan-check"}, [("createdAt", DESCENDING), ("pathId", DESCENDING)]),
+    ("list_paths", {}, [("createdAt", DESCENDING), ("pathId", DESCENDING)]),
+    ("queued_jobs", {"status": "queued"}, None),
+    ("stale_jobs", {"status": "running", "updatedAt": {"$lt": datetime(1970, 1, 1)}}, None),
+]
+
+
+async def ping() -> bool:
+    await mongo.admin.command("ping")
     return True
+
+
+async def ensure_indexes() -> None:
+    await paths.create_index("pathId", unique=True)
+    await paths.create_index([("userId", ASCENDING), ("createdAt", DESCENDING), ("pathId", DESCENDING)])
+    await paths.create_index([("createdAt", DESCENDING), ("pathId", DESCENDING)])
+    await paths.create_index("status", partialFilterExpression={"status": "queued"})
+    await paths.create_index([("status", ASCENDING), ("updatedAt", ASCENDING)], partialFilterExpression={"status": "running"})
+
+    # expiresAt holds the absolute expiry, so the TTL monitor drops entries right after it
+    await plan_cache.create_index("key", unique=True)
+    await plan_cache.create_index("expiresAt", expireAfterSeconds=0)
+
+
+def plan_stages(plan: Dict[str, Any]) -> Set[str]:
+    stages: Set[str] = set()
+    if plan.get("stage"):
+        stages.add(plan["stage"])
+    for child in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(child), dict):
+            stages |= plan_stages(plan[child])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+
+async def check_query_plans() -> List[str]:
+    slow: List[str] = []
+    for name, query, sort in HOT_QUERIES:
+        cursor = paths.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = await cursor.explain()
+        stages = plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            slow.append(name)
+            logger.warning("hot query %s runs as a COLLSCAN (stages: %s), check the indexes on %s",
+                           name, ", ".join(sorted(stages)), paths.name)
+    return slow
@@ -0,0 +1,174 @@
+import os, asyncio, logging
+from typing import Dict, List, Any, AsyncIterator, Set, Tuple
+from dotenv import load_dotenv
+
+from .clients import fetch_catalog, drain_catalog_changes
+from .llm import ask_openai_for_plan, stream_openai_plan
+from .plan_stream import MilestoneStreamParser
+from .planner import plan_locally
+from .plan_repair import repair_plan, repair_milestone, retry_broken, number_milestones
+from .selection import select_candidates
+from .catalog_index import catalog_index
+from .plan_cache import plan_key, get_cached_plan, store_plan
+from .singleflight import SingleFlight
+from .snapshot import schedule_snapshot
+from .models import GenerateRequest, LearningPath
+from .serialization import canonicalize
+from .helpers import gen_id, now_dt
+from .metrics import stage_latency, timed
+
+load_dotenv()
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+
+logger = logging.getLogger(__name__)
+
+catalog_flight = SingleFlight()
+plan_flight = SingleFlight()
+
+
+class PlanError(Exception):
+    pass
+
+
+async def load_catalog() -> Dict[str, List[Dict[str, Any]]]:
+    catalog = await catalog_flight.do("catalog", fetch_catalog)
+    # lists patched in place by an incremental sync keep their identity and are patched in
+    await catalog_index.refresh(catalog, drain_catalog_changes)
+    schedule_snapshot(catalog)
+    return catalog
+
+
+async def _plan(desired_skills: List[str], desired_topics: List[str], key: str) -> Dict[str, Any]:
+    plan = await get_cached_plan(key)
+    if plan is not None:
+        return plan
+
+    with timed(stage_latency, stage="selection"):
+        candidates = select_candidates(desired_skills, desired_topics, catalog_index)
+
+    try:
+        with timed(stage_latency, stage="llm"):
+            plan = await ask_openai_for_plan(
+                desired_skills,
+                desired_topics,
+                candidates["topics"],
+                candidates["skills"],
+                candidates["resources"]
+                )
+    except Exception as e:
+        raise PlanError(e) from e
+
+    with timed(stage_latency, stage="repair"):
+        plan = await repair_plan(plan, desired_skills, desired_topics, candidates, catalog_index)
+    await store_plan(key, plan)
+    return plan
+
+
+async def plan_for(desired_skills: List[str], desired_topics: List[str], planner: str = "auto") -> Dict[str, Any]:
+    """Plans with the LLM, the local planner, or the LLM falling back to the
+    local planner on errors and timeouts ("auto")."""
+    if planner == "local":
+        return plan_locally(desired_skills, desired_topics, catalog_index)
+
+    key = plan_key(desired_skills, desired_topics, catalog_index.version)
+    try:
+        # the shared call keeps running after a timeout and still fills the plan cache
+        return await asyncio.wait_for(
+            plan_flight.do(key, lambda: _plan(desired_skills, desired_topics, key)),
+            timeout=LLM_TIMEOUT
+        )
+    except (PlanError, asyncio.TimeoutError) as e:
+        if planner != "auto":
+            if isinstance(e, asyncio.TimeoutError):
+                raise PlanError(f"no plan within {LLM_TIMEOUT:g}s") from e
+            raise
+        logger.warning("LLM planning failed, using the local planner: %s", e or type(e).__name__)
+        return plan_locally(desired_skills, desired_topics, catalog_index)
+
+
+def normalize_milestone(milestone: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    return {
+        "milestoneId": milestone.get("milestoneId") or f"m{idx}",
+        "type": milestone.get("type"),
+        "label": milestone.get("label"),
+        "skillId": milestone.get("skillId"),
+        "topicId": milestone.get("topicId"),
+        "resources": milestone.get("resources", []),
+        "status": milestone.get("status", "pending")
+    }
+
+
+def normalize_milestones(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [normalize_milestone(milestone, idx) for idx, milestone in enumerate(plan.get("milestones", []), start=1)]
+
+
+async def stream_plan(desired_skills: List[str], desired_topics: List[str], planner: str = "auto") -> AsyncIterator[Tuple[str, Any]]:
+    """Yields ("milestone", milestone) as each one is complete, then ("plan", plan)."""
+    if planner == "local":
+        plan = plan_locally(desired_skills, desired_topics, catalog_index)
+    else:
+        key = plan_key(desired_skills, desired_topics, catalog_index.version)
+        plan = await get_cached_plan(key)
+
+    if plan is None:
+        candidates = select_candidates(desired_skills, desired_topics, catalog_index)
+        parser = MilestoneStreamParser()
+        milestones: List[Dict[str, Any]] = []
+        broken: List[Dict[str, Any]] = []
+        taken: Set[str] = set()
+
+        try:
+            async for chunk in stream_openai_plan(
+                desired_skills,
+                desired_topics,
+                candidates["topics"],
+                candidates["skills"],
+                candidates["resources"]):
+
+                for milestone in parser.feed(chunk):
+                    milestone, is_broken = repair_milestone(milestone, catalog_index)
+                    if is_broken:
+                        broken.append(milestone)
+                        continue
+                    number_milestones([milestone], len(milestones) + 1, taken)
+                    milestones.append(milestone)
+                    yield "milestone", milestone
+            summary = parser.result().get("summary", "")
+        except Exception as e:
+            # once milestones went out the plan can no longer be swapped
+            if planner != "auto" or milestones:
+                raise PlanError(e) from e
+            logger.warning("LLM streaming failed, using the local planner: %s", e)
+            plan = plan_locally(desired_skills, desired_topics, catalog_index)
+        else:
+            if broken:
+                # broken milestones are re-asked once the stream is done and appended
+                for milestone in await retry_broken(broken, desired_skills, desired_topics, candidates, catalog_index):
+                    if milestone is not None:
+                        number_milestones([milestone], len(milestones) + 1, taken)
+                        milestones.append(milestone)
+                        yield "milestone", milestone
+            plan = {"summary": summary, "milestones": milestones}
+            await store_plan(key, plan)
+            yield "plan", plan
+            return
+
+    for milestone in normalize_milestones(plan):
+        yield "milestone", milestone
+
+    yield "plan", plan
+
+
+def build_path_doc(body: GenerateRequest, plan: Dict[str, Any]) -> Dict[str, Any]:
+    return canonicalize({
+        "pathId": gen_id("lp"),
+        "userId": body.userId,
+        "goals": {"skills": body.desiredSkills, "topics": body.desiredTopics},
+        "summary": plan.get("summary", ""),
+        "milestones": normalize_milestones(plan),
+        "status": "done",
+        "planner": plan.get("planner", "llm"),
+        "createdAt": now_dt(),
+        "updatedAt": now_dt()
+    }, LearningPath)
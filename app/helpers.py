@@ -1,6 +1,18 @@
-import requests, uuid
-from typing import Any
+import os, json, base64, asyncio, httpx, uuid
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlsplit
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))
+
+RETRY_STATUSES = {502, 503, 504}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
 
 
 def gen_id(prefix: str) -> str:
@@ -11,12 +23,91 @@ def now_dt():
     return datetime.now()
 
 
-def get_json(url: str, timeout: int = 10) -> Any:
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    data = response.json()
+def encode_cursor(created_at: datetime, path_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), path_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    created_at, path_id = json.loads(raw)
+    return datetime.fromisoformat(created_at), str(path_id)
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    )
+
+
+def get_client(url: str) -> httpx.AsyncClient:
+    parts = urlsplit(url)
+    base = f"{parts.scheme}://{parts.netloc}"
+
+    client = _clients.get(base)
+    if client is None:
+        client = _clients[base] = _new_client()
+    return client
+
+
+async def close_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
 
+
+async def _get(url: str, timeout: Optional[float] = None, **kwargs: Any) -> httpx.Response:
+    client = get_client(url)
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    for attempt in range(HTTP_RETRIES + 1):
+        last_try = attempt == HTTP_RETRIES
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.TransportError:
+            if last_try:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last_try:
+                break
+        await asyncio.sleep(HTTP_RETRY_BACKOFF * (2 ** attempt))
+
+    return response
+
+
+def _unwrap(data: Any) -> Any:
     if isinstance(data, dict) and "data" in data and isinstance(data["data"], list):
         return data["data"]
-
     return data
+
+
+async def get_json(url: str, timeout: Optional[float] = None) -> Any:
+    response = await _get(url, timeout)
+    response.raise_for_status()
+    return _unwrap(response.json())
+
+
+async def get_json_conditional(
+    url: str,
+    etag: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None) -> Tuple[Any, Optional[str]]:
+    """Conditional GET; returns (None, etag) when the upstream answers 304 Not Modified."""
+    kwargs: Dict[str, Any] = {}
+    if etag:
+        kwargs["headers"] = {"If-None-Match": etag}
+    if params:
+        kwargs["params"] = params
+
+    response = await _get(url, timeout, **kwargs)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return _unwrap(response.json()), response.headers.get("etag")
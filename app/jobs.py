@@ -0,0 +1,155 @@
+import os, asyncio, logging
+from datetime import timedelta
+from typing import Dict, List, Any, Optional
+from dotenv import load_dotenv
+
+from .db import paths
+from .generation import load_catalog, plan_for, normalize_milestones, PlanError
+from .models import GenerateRequest
+from .helpers import gen_id, now_dt
+
+load_dotenv()
+
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "8"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "200"))
+# a running job not updated for this long belongs to a process that died
+JOB_LEASE = float(os.getenv("JOB_LEASE", "600"))
+
+TERMINAL_STATUSES = {"done", "failed"}
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobRunner:
+    """Bounded worker pool for `POST /generate?async=true`.
+
+    Job state lives on the learning path document itself (`status`, `error`),
+    so any replica can answer `GET /paths/{pathId}` for it.
+    """
+
+    def __init__(self, concurrency: int, depth: int):
+        self.concurrency = max(1, concurrency)
+        self.depth = max(1, depth)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # submits between their capacity check and put_nowait
+        self._reserved = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.depth)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        await self._requeue_unfinished()
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def submit(self, body: GenerateRequest) -> Dict[str, Any]:
+        if self._queue is None or self._queue.qsize() + self._reserved >= self.depth:
+            raise QueueFull(f"job queue is full ({self.depth})")
+
+        doc = {
+            "pathId": gen_id("lp"),
+            "userId": body.userId,
+            "goals": {"skills": body.desiredSkills, "topics": body.desiredTopics},
+            "plannerMode": body.planner,
+            "status": "queued",
+            "summary": "",
+            "milestones": [],
+            "createdAt": now_dt(),
+            "updatedAt": now_dt()
+        }
+        # the slot is held across the insert, so concurrent submits cannot overfill the queue
+        self._reserved += 1
+        try:
+            await paths.insert_one(doc)
+        finally:
+            self._reserved -= 1
+        self._queue.put_nowait((doc["pathId"], body))
+
+        doc.pop("_id", None)
+        return doc
+
+    async def _requeue_unfinished(self) -> None:
+        # jobs left queued by a previous process, or running in one that was
+        # killed before it could hand them back; the claim in _run keeps
+        # replicas that requeue the same job from running it twice
+        await paths.update_many(
+            {"status": "running", "updatedAt": {"$lt": now_dt() - timedelta(seconds=JOB_LEASE)}},
+            {"$set": {"status": "queued", "updatedAt": now_dt()}}
+        )
+        cursor = paths.find({"status": "queued"}, {"pathId": 1, "userId": 1, "goals": 1, "plannerMode": 1})
+        async for doc in cursor:
+            if self._queue.full():
+                break
+            body = GenerateRequest(
+                userId=doc.get("userId"),
+                desiredSkills=doc.get("goals", {}).get("skills", []),
+                desiredTopics=doc.get("goals", {}).get("topics", []),
+                planner=doc.get("plannerMode") or "auto"
+            )
+            self._queue.put_nowait((doc["pathId"], body))
+
+    async def _work(self) -> None:
+        while True:
+            path_id, body = await self._queue.get()
+            try:
+                await self._run(path_id, body)
+            except Exception as e:
+                logger.exception("job %s crashed: %s", path_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, path_id: str, body: GenerateRequest) -> None:
+        claimed = await paths.update_one(
+            {"pathId": path_id, "status": "queued"},
+            {"$set": {"status": "running", "updatedAt": now_dt()}}
+        )
+        if not claimed.modified_count:
+            return
+
+        try:
+            await self._complete(path_id, body)
+        except asyncio.CancelledError:
+            # stopped mid-job (deploy, scale-in): hand it back to the next process
+            await paths.update_one(
+                {"pathId": path_id, "status": "running"},
+                {"$set": {"status": "queued", "updatedAt": now_dt()}}
+            )
+            raise
+
+    async def _complete(self, path_id: str, body: GenerateRequest) -> None:
+        try:
+            await load_catalog()
+        except Exception as e:
+            await _set(path_id, {"status": "failed", "error": f"Upstream error: {e}"})
+            return
+
+        try:
+            plan = await plan_for(body.desiredSkills, body.desiredTopics, body.planner)
+        except PlanError as e:
+            await _set(path_id, {"status": "failed", "error": f"OpenAI error: {e}"})
+            return
+
+        await _set(path_id, {
+            "status": "done",
+            "summary": plan.get("summary", ""),
+            "milestones": normalize_milestones(plan),
+            "planner": plan.get("planner", "llm")
+        })
+
+
+async def _set(path_id: str, fields: Dict[str, Any]) -> None:
+    await paths.update_one({"pathId": path_id}, {"$set": {**fields, "updatedAt": now_dt()}})
+
+
+job_runner = JobRunner(JOB_CONCURRENCY, JOB_QUEUE_DEPTH)
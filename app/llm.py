@@ -1,7 +1,9 @@
-import os, json
-from typing import Dict, List, Any
+import os, json, time, logging
+from typing import Dict, List, Any, AsyncIterator, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+from .selection import topic_payload, skill_payload, resource_payload
+from .metrics import Counter, Gauge, Histogram
 
 load_dotenv()
 
@@ -9,7 +11,22 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.1"))
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# USD per 1M prompt / completion tokens, override with OPENAI_PRICES='{"model": [in, out]}'
+OPENAI_PRICES: Dict[str, List[float]] = {"gpt-4o-mini": [0.15, 0.60], "gpt-4o": [2.50, 10.00]}
+OPENAI_PRICES.update(json.loads(os.getenv("OPENAI_PRICES", "{}")))
+
+client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
+logger = logging.getLogger(__name__)
+
+llm_requests = Counter("llm_requests_total", "LLM calls by outcome", ["model", "call", "outcome"])
+llm_prompt_tokens = Counter("llm_prompt_tokens_total", "Prompt tokens reported by the API", ["model", "call"])
+llm_completion_tokens = Counter("llm_completion_tokens_total", "Completion tokens reported by the API", ["model", "call"])
+llm_cost = Counter("llm_cost_usd_total", "Estimated LLM spend from OPENAI_PRICES", ["model"])
+llm_latency = Histogram("llm_latency_seconds", "LLM call latency", ["model", "call"])
+llm_prompt_bytes = Histogram("llm_prompt_bytes", "Serialized prompt size", ["call"],
+                             buckets=(1e3, 4e3, 1.6e4, 3.2e4, 6.4e4, 1.28e5, 2.56e5, 5.12e5, 1e6))
+llm_prompt_items = Gauge("llm_prompt_catalog_items", "Catalog items in the last prompt", ["catalog"])
 
 SYSTEM_PROMPT = """Sie sind ein einfacher Lehrplan-Planer.
 Geben Sie STRENG JSON zurück mit:
@@ -20,43 +37,166 @@ Geben Sie STRENG JSON zurück mit:
 Verwenden Sie nur IDs, die in den bereitgestellten Katalogen existieren. Kein zusätzlicher Text.
 """
 
-def ask_openai_for_plan(
+REPAIR_PROMPT = """Sie korrigieren einzelne Meilensteine eines Lernpfads.
+"brokenMilestones" verweisen auf unbekannte IDs oder sind unvollständig.
+Geben Sie STRENG JSON zurück mit:
+- "milestones": genau ein korrigierter Meilenstein pro Eintrag in "brokenMilestones", in derselben Reihenfolge,
+  mit type ("skill"|"topic"), label, skillId (oder null), topicId (oder null), resources: [{resourceId, why}]
+Verwenden Sie nur IDs, die in den bereitgestellten Katalogen existieren. Kein zusätzlicher Text.
+"""
+
+def _messages(
     desired_skills: List[str],
     desired_topics: List[str],
     topics: List[Dict[str, Any]],
     skills: List[Dict[str, Any]],
-    resources: List[Dict[str, Any]]) -> Dict[str, Any]:
-
-    if not client:
-        raise RuntimeError("OPENAI_API_KEY is not set in .env")
+    resources: List[Dict[str, Any]],
+    system_prompt: str = SYSTEM_PROMPT,
+    **extra: Any) -> List[Dict[str, str]]:
 
     user_payload = {
         "desiredSkills": desired_skills,
         "desiredTopics": desired_topics,
-        "topics": [{
-            "id": topic.get("id"), 
-            "name": topic.get("name")
-            } for topic in topics],
-        "skills": [{
-            "id": skill.get("id"), 
-            "name": skill.get("skill"), 
-            "topicID": skill.get("topicID")
-            } for skill in skills],
-        "resources": [{
-            "id": resource.get("id"),
-            "title": resource.get("title"), 
-            "description": resource.get("description", "")
-        } for resource in resources]
+        "topics": [topic_payload(topic) for topic in topics],
+        "skills": [skill_payload(skill) for skill in skills],
+        "resources": [resource_payload(resource) for resource in resources],
+        **extra
     }
 
-    response = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)}
-        ],
-        temperature=OPENAI_TEMPERATURE,
-        response_format={"type": "json_object"}
-    )
-
-    return json.loads(response.choices[0].message.content)
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)}
+    ]
+
+
+def _record(
+    call: str,
+    messages: List[Dict[str, str]],
+    counts: Dict[str, int],
+    started: float,
+    usage: Any = None,
+    error: Optional[BaseException] = None) -> None:
+    """Updates the LLM metrics and writes one structured log line per call."""
+    latency = time.perf_counter() - started
+    prompt_bytes = sum(len(message["content"].encode("utf-8")) for message in messages)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    price_in, price_out = OPENAI_PRICES.get(OPENAI_MODEL, (0.0, 0.0))
+    cost = (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+    llm_requests.inc(model=OPENAI_MODEL, call=call, outcome="error" if error else "ok")
+    llm_prompt_tokens.inc(prompt_tokens, model=OPENAI_MODEL, call=call)
+    llm_completion_tokens.inc(completion_tokens, model=OPENAI_MODEL, call=call)
+    llm_cost.inc(cost, model=OPENAI_MODEL)
+    llm_latency.observe(latency, model=OPENAI_MODEL, call=call)
+    llm_prompt_bytes.observe(prompt_bytes, call=call)
+    for catalog, count in counts.items():
+        llm_prompt_items.set(count, catalog=catalog)
+
+    logger.info("llm_call %s", json.dumps({
+        "call": call,
+        "model": OPENAI_MODEL,
+        "outcome": "error" if error else "ok",
+        "error": str(error) if error else None,
+        "latencyMs": round(latency * 1000, 1),
+        "promptBytes": prompt_bytes,
+        "promptTokens": prompt_tokens,
+        "completionTokens": completion_tokens,
+        "costUsd": round(cost, 6),
+        **{f"{catalog}Count": count for catalog, count in counts.items()}
+    }))
+
+
+async def _complete(call: str, messages: List[Dict[str, str]], counts: Dict[str, int]) -> str:
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY is not set in .env")
+
+    started = time.perf_counter()
+    try:
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            temperature=OPENAI_TEMPERATURE,
+            response_format={"type": "json_object"}
+        )
+    except Exception as e:
+        _record(call, messages, counts, started, error=e)
+        raise
+
+    _record(call, messages, counts, started, response.usage)
+    return response.choices[0].message.content
+
+
+def _counts(topics: List[Any], skills: List[Any], resources: List[Any]) -> Dict[str, int]:
+    return {"topics": len(topics), "skills": len(skills), "resources": len(resources)}
+
+
+async def ask_openai_for_plan(
+    desired_skills: List[str],
+    desired_topics: List[str],
+    topics: List[Dict[str, Any]],
+    skills: List[Dict[str, Any]],
+    resources: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+    content = await _complete(
+        "plan",
+        _messages(desired_skills, desired_topics, topics, skills, resources),
+        _counts(topics, skills, resources))
+
+    return json.loads(content)
+
+
+async def ask_openai_for_milestones(
+    desired_skills: List[str],
+    desired_topics: List[str],
+    broken: List[Dict[str, Any]],
+    topics: List[Dict[str, Any]],
+    skills: List[Dict[str, Any]],
+    resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Asks for replacements of the given milestones only, in the same order."""
+
+    content = await _complete(
+        "repair",
+        _messages(desired_skills, desired_topics, topics, skills, resources,
+                  system_prompt=REPAIR_PROMPT, brokenMilestones=broken),
+        _counts(topics, skills, resources))
+
+    return json.loads(content).get("milestones", [])
+
+
+async def stream_openai_plan(
+    desired_skills: List[str],
+    desired_topics: List[str],
+    topics: List[Dict[str, Any]],
+    skills: List[Dict[str, Any]],
+    resources: List[Dict[str, Any]]) -> AsyncIterator[str]:
+
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY is not set in .env")
+
+    messages = _messages(desired_skills, desired_topics, topics, skills, resources)
+    counts = _counts(topics, skills, resources)
+    started = time.perf_counter()
+    usage = None
+
+    try:
+        stream = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            temperature=OPENAI_TEMPERATURE,
+            response_format={"type": "json_object"},
+            stream=True,
+            # the last chunk then carries the token usage
+            stream_options={"include_usage": True}
+        )
+
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        _record("stream", messages, counts, started, usage, error=e)
+        raise
+
+    _record("stream", messages, counts, started, usage)
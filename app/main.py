@@ -1,20 +1,81 @@
-import os
-from typing import Dict, List, Any, Optional
-from fastapi import FastAPI, HTTPException, Query, Path, Body
+import os, json, time, asyncio, logging
+from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Literal, Union
+from fastapi import FastAPI, HTTPException, Query, Path, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
+from pymongo import ReturnDocument
 
-from .db import mongo, paths, ping
-from .clients import fetch_topics, fetch_skills, fetch_resources
-from .llm import ask_openai_for_plan
-from .models import GenerateRequest, LearningPath, Milestone
-from .helpers import gen_id, now_dt
+from .db import mongo, paths, ping, ensure_indexes, check_query_plans
+from .clients import invalidate_catalog, catalog_cache
+from .plan_cache import plan_cache_stats, plan_cache_size
+from .snapshot import restore_snapshot, flush_snapshot, snapshot_stats
+from .generation import load_catalog, plan_for, stream_plan, build_path_doc, PlanError, plan_flight
+from .jobs import job_runner, QueueFull, TERMINAL_STATUSES
+from .batch import generate_batch, BATCH_MAX_ITEMS
+from .models import (GenerateRequest, LearningPath, LearningPathSummary, Milestone, MilestoneStatus, JobAccepted,
+                     MilestoneUpdate, MilestoneStatusUpdate, PathProgress, BatchResult)
+from .helpers import close_clients, encode_cursor, decode_cursor, now_dt
+from .serialization import FAST_SERIALIZATION, dumps, prepare, dump_documents
+from .metrics import Counter, Gauge, Histogram, stage_latency, timed, render as render_metrics
 
 load_dotenv()
 
 PORT = int(os.getenv("PORT", "8000"))
+PATHS_PAGE_SIZE = int(os.getenv("PATHS_PAGE_SIZE", "50"))
+PATHS_MAX_PAGE_SIZE = int(os.getenv("PATHS_MAX_PAGE_SIZE", "200"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "0.5"))
+JOB_EVENTS_TIMEOUT = float(os.getenv("JOB_EVENTS_TIMEOUT", "300"))
+# well below Prometheus' 10s scrape timeout, so a Mongo outage does not hide every metric
+METRICS_MONGO_TIMEOUT = float(os.getenv("METRICS_MONGO_TIMEOUT", "1"))
 
-app = FastAPI(title="Learning Path Generator", version="0.0.1")
+logger = logging.getLogger(__name__)
+
+http_requests = Counter("http_requests_total", "Requests by route and status", ["method", "route", "status"])
+http_latency = Histogram("http_request_seconds", "Request latency by route and status", ["method", "route", "status"])
+generations_in_flight = Gauge("generations_in_flight", "Synchronous /generate requests being served")
+cache_entries = Gauge("cache_entries", "Entries per cache", ["cache"])
+plan_calls_in_flight = Gauge("plan_calls_in_flight", "Distinct plan generations running, shared by identical requests")
+job_queue_depth = Gauge("job_queue_depth", "Queued background generations")
+
+
+async def _warm_catalog() -> None:
+    try:
+        await load_catalog()
+    except Exception as e:
+        logger.warning("could not load the catalog at startup: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await ensure_indexes()
+        await check_query_plans()
+    except Exception as e:
+        logger.warning("could not bootstrap Mongo indexes: %s", e)
+    try:
+        await restore_snapshot()
+    except Exception as e:
+        logger.warning("could not restore the catalog snapshot: %s", e)
+    # with a snapshot this returns at once and revalidates in the background
+    warm = asyncio.create_task(_warm_catalog())
+    try:
+        await job_runner.start()
+    except Exception as e:
+        logger.warning("could not requeue unfinished jobs: %s", e)
+    yield
+    warm.cancel()
+    await job_runner.stop()
+    await flush_snapshot()
+    await close_clients()
+    await mongo.close()
+
+
+app = FastAPI(title="Learning Path Generator", version="0.0.1", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,91 +84,331 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # the route template keeps label cardinality bounded; streamed bodies are timed to the headers
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        labels = {"method": request.method, "route": route, "status": str(status)}
+        http_requests.inc(**labels)
+        http_latency.observe(time.perf_counter() - started, **labels)
+
+
 @app.get("/")
-def root():
+async def root():
     return {"service": "learning-path-generator", "docs":"/docs", "health": "/healthz"}
 
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     try:
-        ping()
+        await ping()
     except Exception as e:
         raise HTTPException(500, f"Mongo database down: {e}")
     return {"status": "ok", "db": "up"}
 
 
-@app.post("/generate", response_model=LearningPath)
-def generate_path(body: GenerateRequest = Body(...)):
+@app.post("/catalog/invalidate")
+async def invalidate_catalog_cache():
+    invalidate_catalog()
+    return {"status": "ok", "catalog": "invalidated"}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {"plans": plan_cache_stats(), "catalog": {"entries": len(catalog_cache)}, "snapshot": snapshot_stats()}
+
+
+@app.get("/metrics")
+async def metrics():
+    cache_entries.set(len(catalog_cache), cache="catalog")
     try:
-        topics = fetch_topics()
-        skills = fetch_skills()
-        resources = fetch_resources()
+        cache_entries.set(await asyncio.wait_for(plan_cache_size(), timeout=METRICS_MONGO_TIMEOUT), cache="plan")
     except Exception as e:
-        raise HTTPException(502, f"Upstream error: {e}")
-    
+        # the last known count stays in place
+        logger.warning("could not count plan cache entries: %s", e or type(e).__name__)
+    plan_calls_in_flight.set(plan_flight.in_flight())
+    job_queue_depth.set(job_runner.queued())
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/generate", response_model=LearningPath, responses={202: {"model": JobAccepted}})
+async def generate_path(
+    body: GenerateRequest = Body(...),
+    run_async: bool = Query(False, alias="async")):
+
+    if run_async:
+        try:
+            job = await job_runner.submit(body)
+        except QueueFull as e:
+            raise HTTPException(503, f"Too many pending generations: {e}")
+        return JSONResponse(status_code=202, content={"pathId": job["pathId"], "status": job["status"]})
+
+    generations_in_flight.inc()
     try:
-        plan = ask_openai_for_plan(
-            body.desiredSkills,
-            body.desiredTopics,
-            topics,
-            skills,
-            resources
-            )
-    except Exception as e:
-        raise HTTPException(502, f"OpenAI error: {e}")
-    
-    milestones: List[Dict[str, Any]] = []
-    for idx, milestone in enumerate(plan.get("milestones", []), start=1):
-        milestones.append({
-            "milestoneId": milestone.get("milestoneId") or f"m{idx}",
-            "type": milestone.get("type"),
-            "label": milestone.get("label"),
-            "skillId": milestone.get("skillId"),
-            "topicId": milestone.get("topicId"),
-            "resources": milestone.get("resources", []),
-            "status": milestone.get("status", "pending")
-        })
-
-    doc = {
-        "pathId": gen_id("lp"),
-        "userId": body.userId,
-        "goals": {"skills": body.desiredSkills, "topics": body.desiredTopics},
-        "summary": plan.get("summary", ""),
-        "milestones": milestones,
-        "createdAt": now_dt(),
-        "updatedAt": now_dt()
-    }
-
-    paths.insert_one(doc)
+        try:
+            with timed(stage_latency, stage="catalog"):
+                await load_catalog()
+        except Exception as e:
+            raise HTTPException(502, f"Upstream error: {e}")
+
+        try:
+            with timed(stage_latency, stage="plan"):
+                plan = await plan_for(body.desiredSkills, body.desiredTopics, body.planner)
+        except PlanError as e:
+            raise HTTPException(502, f"OpenAI error: {e}")
+
+        with timed(stage_latency, stage="normalization"):
+            doc = build_path_doc(body, plan)
+
+        with timed(stage_latency, stage="mongo_insert"):
+            await paths.insert_one(doc)
+    finally:
+        generations_in_flight.dec()
 
     doc.pop("_id", None)
     return doc
 
 
-@app.get("/paths", response_model=List[LearningPath])
-def list_paths(userId: Optional[str] = Query(None)):
-    query = {}
+@app.post("/generate/batch", response_model=BatchResult)
+async def generate_path_batch(body: List[GenerateRequest] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS)):
+    try:
+        await load_catalog()
+    except Exception as e:
+        raise HTTPException(502, f"Upstream error: {e}")
+
+    items = await generate_batch(body)
+    succeeded = sum(1 for item in items if item["ok"])
+
+    return {"succeeded": succeeded, "failed": len(items) - succeeded, "items": items}
+
+
+def _stream_event(format: str, name: str, payload: Dict[str, Any]) -> str:
+    if format == "sse":
+        return f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": name, **payload}, ensure_ascii=False) + "\n"
+
+
+@app.post("/generate/stream")
+async def generate_path_stream(
+    body: GenerateRequest = Body(...),
+    format: Literal["ndjson", "sse"] = Query("ndjson")):
+
+    try:
+        await load_catalog()
+    except Exception as e:
+        raise HTTPException(502, f"Upstream error: {e}")
+
+    async def events():
+        plan = None
+        try:
+            async for kind, value in stream_plan(body.desiredSkills, body.desiredTopics, body.planner):
+                if kind == "milestone":
+                    yield _stream_event(format, "milestone", {"milestone": value})
+                else:
+                    plan = value
+        except PlanError as e:
+            yield _stream_event(format, "error", {"detail": f"OpenAI error: {e}"})
+            return
+
+        doc = build_path_doc(body, plan)
+        await paths.insert_one(doc)
+
+        doc.pop("_id", None)
+        yield _stream_event(format, "path", {"path": jsonable_encoder(doc)})
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "pathId": 1,
+    "userId": 1,
+    "goals": 1,
+    "summary": 1,
+    "status": 1,
+    "error": 1,
+    "milestoneCount": {"$size": {"$ifNull": ["$milestones", []]}},
+    "createdAt": 1,
+    "updatedAt": 1,
+    "schemaVersion": 1
+}
+
+
+@app.get("/paths", response_model=List[Union[LearningPath, LearningPathSummary]])
+async def list_paths(
+    request: Request,
+    response: Response,
+    userId: Optional[str] = Query(None),
+    limit: int = Query(PATHS_PAGE_SIZE, ge=1, le=PATHS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Literal["full", "summary"] = Query("full")):
+
+    query: Dict[str, Any] = {}
     
     if userId:
         query["userId"] = userId
-    
-    items = list(paths.find(query).sort("createdAt", -1))
 
-    for item in items:
-        item.pop("_id", None)
+    if cursor:
+        try:
+            created_at, path_id = decode_cursor(cursor)
+        except Exception:
+            raise HTTPException(400, "Invalid cursor")
+        query["$or"] = [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "pathId": {"$lt": path_id}}
+        ]
+
+    projection = SUMMARY_PROJECTION if fields == "summary" else {"_id": 0}
+    items = await paths.find(query, projection).sort([("createdAt", -1), ("pathId", -1)]).limit(limit + 1).to_list()
+
+    headers: Dict[str, str] = {}
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["createdAt"], items[-1]["pathId"])
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+    if FAST_SERIALIZATION:
+        model = LearningPathSummary if fields == "summary" else LearningPath
+        return Response(dump_documents(items, model), media_type="application/json", headers=headers)
+
+    response.headers.update(headers)
 
     return items
 
+@app.get("/paths/export")
+async def export_paths(
+    userId: Optional[str] = Query(None),
+    createdFrom: Optional[datetime] = Query(None),
+    createdTo: Optional[datetime] = Query(None),
+    milestoneStatus: Optional[MilestoneStatus] = Query(None)):
+
+    query: Dict[str, Any] = {}
+
+    if userId:
+        query["userId"] = userId
+    if createdFrom or createdTo:
+        query["createdAt"] = {}
+        if createdFrom:
+            query["createdAt"]["$gte"] = createdFrom
+        if createdTo:
+            query["createdAt"]["$lt"] = createdTo
+    if milestoneStatus:
+        query["milestones.status"] = milestoneStatus
+
+    async def lines():
+        cursor = paths.find(query, {"_id": 0, "schemaVersion": 0}).sort([("createdAt", -1), ("pathId", -1)]).batch_size(EXPORT_BATCH_SIZE)
+        batch: List[bytes] = []
+        async for doc in cursor:
+            batch.append(dumps(doc))
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield b"\n".join(batch) + b"\n"
+                batch = []
+        if batch:
+            yield b"\n".join(batch) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @app.get("/paths/{pathId}", response_model=LearningPath)
-def get_path(pathId: str = Path(...)):
-    item = paths.find_one({"pathId": pathId})
+async def get_path(pathId: str = Path(...)):
+    item = await paths.find_one({"pathId": pathId})
 
     if not item:
         raise HTTPException(404, "Not found")
     
     item.pop("_id", None)
 
+    if FAST_SERIALIZATION:
+        return Response(dumps(prepare(item, LearningPath)), media_type="application/json")
+
+    return item
+
+
+PROGRESS_PROJECTION = {"_id": 0, "pathId": 1, "milestones.milestoneId": 1, "milestones.status": 1, "updatedAt": 1}
+
+
+@app.patch("/paths/{pathId}/milestones/{milestoneId}", response_model=Milestone)
+async def update_milestone(
+    pathId: str = Path(...),
+    milestoneId: str = Path(...),
+    body: MilestoneUpdate = Body(...)):
+
+    # single atomic write: the array filter picks the milestone, $ projects it back
+    item = await paths.find_one_and_update(
+        {"pathId": pathId, "milestones.milestoneId": milestoneId},
+        {"$set": {"milestones.$[m].status": body.status, "updatedAt": now_dt()}},
+        array_filters=[{"m.milestoneId": milestoneId}],
+        projection={"_id": 0, "milestones.$": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+    if not item:
+        raise HTTPException(404, "Not found")
+
+    return item["milestones"][0]
+
+
+@app.patch("/paths/{pathId}/milestones", response_model=PathProgress)
+async def update_milestones(
+    pathId: str = Path(...),
+    body: List[MilestoneStatusUpdate] = Body(..., min_length=1)):
+
+    # the last update for a milestone wins, like it would with separate requests
+    statuses = {update.milestoneId: update.status for update in body}
+
+    update: Dict[str, Any] = {"updatedAt": now_dt()}
+    array_filters = []
+    for idx, (milestone_id, status) in enumerate(statuses.items()):
+        update[f"milestones.$[m{idx}].status"] = status
+        array_filters.append({f"m{idx}.milestoneId": milestone_id})
+
+    item = await paths.find_one_and_update(
+        {"pathId": pathId},
+        {"$set": update},
+        array_filters=array_filters,
+        projection=PROGRESS_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+
+    if not item:
+        raise HTTPException(404, "Not found")
+
+    known = {milestone.get("milestoneId") for milestone in item.get("milestones", [])}
+    item["unknownMilestoneIds"] = [milestone_id for milestone_id in statuses if milestone_id not in known]
     return item
 
 
+@app.get("/paths/{pathId}/events")
+async def path_events(pathId: str = Path(...)):
+    # covered by the unique pathId index, no document fetch
+    if not await paths.find_one({"pathId": pathId}, {"_id": 0, "pathId": 1}):
+        raise HTTPException(404, "Not found")
+
+    async def events():
+        last = None
+        waited = 0.0
+        while waited < JOB_EVENTS_TIMEOUT:
+            item = await paths.find_one({"pathId": pathId}, {"_id": 0, "pathId": 1, "status": 1, "error": 1, "updatedAt": 1})
+            if item is None:
+                return
+
+            state = {"pathId": item["pathId"], "status": item.get("status") or "done", "error": item.get("error")}
+            if state != last:
+                last = state
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+            if state["status"] in TERMINAL_STATUSES:
+                return
+
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+            waited += JOB_EVENTS_POLL_INTERVAL
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -4,18 +4,21 @@ from datetime import datetime
 
 MilestoneType = Literal["skill", "topic"]
 MilestoneStatus = Literal ["pending", "in-progress", "done"]
+PathStatus = Literal["queued", "running", "done", "failed"]
+PlannerMode = Literal["auto", "llm", "local"]
 
 class GenerateRequest(BaseModel): #erstellt eine Klasse aus der Klasse BaseModel
     userId: Optional[str] = None
     desiredSkills: List[str] = Field(default_factory=list)
     desiredTopics: List[str] = Field(default_factory=list)
+    planner: PlannerMode = "auto"
 
 class ResourceRef(BaseModel):
     resourceId: str
     why: Optional[str] = None
 
 class Milestone(BaseModel):
-    milestineId: str
+    milestoneId: str
     type: MilestoneType
     label: str
     skillId: Optional[str] = None
@@ -29,5 +32,51 @@ class LearningPath(BaseModel):
     goals: Dict[str, List[str]]
     summary: Optional[str] = None
     milestones: List[Milestone]
+    status: Optional[PathStatus] = None
+    error: Optional[str] = None
+    planner: Optional[Literal["llm", "local"]] = None
     createdAt: datetime
-    updatedAt: datetime
\ No newline at end of file
+    updatedAt: datetime
+
+class JobAccepted(BaseModel):
+    pathId: str
+    status: PathStatus
+
+class LearningPathSummary(BaseModel):
+    pathId: str
+    userId: Optional[str] = None
+    goals: Dict[str, List[str]]
+    summary: Optional[str] = None
+    milestoneCount: int = 0
+    status: Optional[PathStatus] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+class MilestoneUpdate(BaseModel):
+    status: MilestoneStatus
+
+class MilestoneStatusUpdate(BaseModel):
+    milestoneId: str
+    status: MilestoneStatus
+
+class MilestoneProgress(BaseModel):
+    milestoneId: str
+    status: MilestoneStatus
+
+class PathProgress(BaseModel):
+    pathId: str
+    milestones: List[MilestoneProgress]
+    unknownMilestoneIds: List[str] = Field(default_factory=list)
+    updatedAt: datetime
+
+class BatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    pathId: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BatchItemResult]
\ No newline at end of file
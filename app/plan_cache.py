@@ -0,0 +1,76 @@
+import os, json, hashlib, logging
+from datetime import timedelta
+from typing import Dict, List, Any, Optional
+from dotenv import load_dotenv
+
+from . import db
+from .helpers import now_dt
+from .llm import OPENAI_MODEL
+
+load_dotenv()
+
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "1").strip() in {"1", "true", "yes", "on"}
+PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", "86400"))
+
+logger = logging.getLogger(__name__)
+
+stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def normalize_goals(goals: List[str]) -> List[str]:
+    return sorted({" ".join(goal.lower().split()) for goal in goals if goal and goal.strip()})
+
+
+def plan_key(desired_skills: List[str], desired_topics: List[str], catalog_version: str) -> str:
+    material = {
+        "skills": normalize_goals(desired_skills),
+        "topics": normalize_goals(desired_topics),
+        "catalog": catalog_version,
+        "model": OPENAI_MODEL
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+async def get_cached_plan(key: str) -> Optional[Dict[str, Any]]:
+    if not PLAN_CACHE_ENABLED:
+        return None
+
+    try:
+        entry = await db.plan_cache.find_one({"key": key, "expiresAt": {"$gt": now_dt()}})
+    except Exception as e:
+        stats["errors"] += 1
+        logger.warning("plan cache lookup failed: %s", e)
+        return None
+
+    if entry is None:
+        stats["misses"] += 1
+        return None
+
+    stats["hits"] += 1
+    return entry["plan"]
+
+
+async def store_plan(key: str, plan: Dict[str, Any]) -> None:
+    if not PLAN_CACHE_ENABLED:
+        return
+
+    created = now_dt()
+    try:
+        await db.plan_cache.replace_one(
+            {"key": key},
+            {"key": key, "plan": plan, "createdAt": created, "expiresAt": created + timedelta(seconds=PLAN_CACHE_TTL)},
+            upsert=True
+        )
+    except Exception as e:
+        stats["errors"] += 1
+        logger.warning("plan cache write failed: %s", e)
+
+
+def plan_cache_stats() -> Dict[str, Any]:
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hitRate": stats["hits"] / lookups if lookups else 0.0}
+
+
+async def plan_cache_size() -> int:
+    # from collection metadata, no scan
+    return await db.plan_cache.estimated_document_count()
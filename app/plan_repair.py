@@ -0,0 +1,196 @@
+import os, logging
+from typing import Dict, List, Any, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+from .catalog_index import CatalogIndex, tokenize, skill_name
+from .llm import ask_openai_for_milestones
+
+load_dotenv()
+
+PLAN_REPAIR_RETRIES = int(os.getenv("PLAN_REPAIR_RETRIES", "1"))
+
+MILESTONE_TYPES = {"skill", "topic"}
+MILESTONE_STATUSES = {"pending", "in-progress", "done"}
+
+logger = logging.getLogger(__name__)
+
+
+def _known(value: Any, by_id: Dict[Any, Any]) -> Optional[Any]:
+    # without a loaded catalog there is nothing to check against
+    if value is None or value == "":
+        return None
+    if not by_id or value in by_id:
+        return value
+    return None
+
+
+def _best_match(index: CatalogIndex, postings: Dict[str, List[Any]], label: Optional[str]) -> Optional[Any]:
+    scores = index.match(postings, tokenize(label))
+    if not scores:
+        return None
+    return min(scores, key=lambda item_id: (-scores[item_id], str(item_id)))
+
+
+def _resources(refs: Any, index: CatalogIndex) -> List[Dict[str, Any]]:
+    if not isinstance(refs, list):
+        return []
+
+    seen: Set[Any] = set()
+    kept = []
+    for ref in refs:
+        if not isinstance(ref, dict):
+            continue
+        resource_id = _known(ref.get("resourceId"), index.resources_by_id)
+        if resource_id is None or resource_id in seen:
+            continue
+        seen.add(resource_id)
+        kept.append({"resourceId": resource_id, "why": ref.get("why")})
+    return kept
+
+
+def repair_milestone(milestone: Dict[str, Any], index: CatalogIndex) -> Tuple[Dict[str, Any], bool]:
+    """Checks a milestone against the catalog IDs.
+
+    Unknown skill and topic IDs are remapped by label where possible and
+    dropped otherwise, unknown resources are removed and missing fields are
+    filled from the catalog. Returns the milestone and whether it is still
+    broken, i.e. could not be tied to the catalog or would not validate.
+    """
+    label = milestone.get("label") if isinstance(milestone.get("label"), str) else None
+    kind = milestone.get("type") if milestone.get("type") in MILESTONE_TYPES else None
+
+    skill_id = _known(milestone.get("skillId"), index.skills_by_id)
+    if skill_id is None and kind != "topic" and index.skills_by_id:
+        skill_id = _best_match(index, index.skill_postings, label)
+
+    topic_id = _known(milestone.get("topicId"), index.topics_by_id)
+    if topic_id is None and skill_id is not None:
+        topic_id = _known(index.skill_topic.get(skill_id), index.topics_by_id)
+    if topic_id is None and kind == "topic" and index.topics_by_id:
+        topic_id = _best_match(index, index.topic_postings, label)
+
+    if kind is None:
+        kind = "skill" if skill_id is not None else "topic" if topic_id is not None else None
+
+    if not label:
+        if kind == "skill" and skill_id in index.skills_by_id:
+            label = skill_name(index.skills_by_id[skill_id])
+        elif topic_id in index.topics_by_id:
+            label = index.topics_by_id[topic_id].get("name")
+
+    status = milestone.get("status") if milestone.get("status") in MILESTONE_STATUSES else "pending"
+
+    repaired = {
+        "milestoneId": milestone.get("milestoneId") if isinstance(milestone.get("milestoneId"), str) else None,
+        "type": kind,
+        "label": label,
+        "skillId": skill_id,
+        "topicId": topic_id,
+        "resources": _resources(milestone.get("resources"), index),
+        "status": status
+    }
+
+    broken = (
+        kind is None
+        or not label
+        or (kind == "skill" and skill_id is None and bool(index.skills_by_id))
+        or (kind == "topic" and topic_id is None and bool(index.topics_by_id))
+    )
+    return repaired, broken
+
+
+def number_milestones(milestones: List[Dict[str, Any]], start: int = 1, taken: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """Gives every milestone a milestoneId that is unique within the plan."""
+    taken = set() if taken is None else taken
+    for idx, milestone in enumerate(milestones, start=start):
+        milestone_id = milestone.get("milestoneId")
+        if not milestone_id or milestone_id in taken:
+            milestone_id = f"m{idx}"
+            while milestone_id in taken:
+                milestone_id += "x"
+            milestone["milestoneId"] = milestone_id
+        taken.add(milestone_id)
+    return milestones
+
+
+async def retry_broken(
+    broken: List[Dict[str, Any]],
+    desired_skills: List[str],
+    desired_topics: List[str],
+    candidates: Dict[str, List[Dict[str, Any]]],
+    index: CatalogIndex) -> List[Optional[Dict[str, Any]]]:
+    """Asks the LLM again for the broken milestones only.
+
+    Returns one entry per broken milestone: the repaired replacement, or None
+    when it could not be fixed within PLAN_REPAIR_RETRIES.
+    """
+    fixed: List[Optional[Dict[str, Any]]] = [None] * len(broken)
+    pending = list(range(len(broken)))
+
+    for _ in range(PLAN_REPAIR_RETRIES):
+        if not pending:
+            break
+        try:
+            replacements = await ask_openai_for_milestones(
+                desired_skills,
+                desired_topics,
+                [broken[position] for position in pending],
+                candidates["topics"],
+                candidates["skills"],
+                candidates["resources"])
+        except Exception as e:
+            logger.warning("milestone repair failed: %s", e)
+            break
+        if not isinstance(replacements, list):
+            replacements = []
+
+        still_broken = []
+        for position, replacement in zip(pending, replacements + [None] * len(pending)):
+            if isinstance(replacement, dict):
+                repaired, is_broken = repair_milestone(replacement, index)
+                if not is_broken:
+                    repaired["milestoneId"] = broken[position].get("milestoneId")
+                    fixed[position] = repaired
+                    continue
+            still_broken.append(position)
+        pending = still_broken
+
+    return fixed
+
+
+async def repair_plan(
+    plan: Dict[str, Any],
+    desired_skills: List[str],
+    desired_topics: List[str],
+    candidates: Dict[str, List[Dict[str, Any]]],
+    index: CatalogIndex) -> Dict[str, Any]:
+    """Validates an LLM plan against the catalog and re-asks the LLM only for
+    the milestones that could not be repaired locally. Milestones that stay
+    broken are dropped."""
+    raw = plan.get("milestones") if isinstance(plan.get("milestones"), list) else []
+
+    milestones: List[Optional[Dict[str, Any]]] = []
+    broken: Dict[int, Dict[str, Any]] = {}
+    for milestone in raw:
+        if not isinstance(milestone, dict):
+            continue
+        repaired, is_broken = repair_milestone(milestone, index)
+        if is_broken:
+            broken[len(milestones)] = repaired
+            milestones.append(None)
+        else:
+            milestones.append(repaired)
+
+    if broken:
+        replacements = await retry_broken(list(broken.values()), desired_skills, desired_topics, candidates, index)
+        for position, replacement in zip(broken, replacements):
+            milestones[position] = replacement
+        logger.info("plan repair: %d broken milestones, %d fixed",
+                    len(broken), sum(replacement is not None for replacement in replacements))
+
+    summary = plan.get("summary") if isinstance(plan.get("summary"), str) else ""
+    return {
+        **plan,
+        "summary": summary,
+        "milestones": number_milestones([milestone for milestone in milestones if milestone is not None])
+    }
@@ -0,0 +1,72 @@
+import json
+from typing import Dict, List, Any, Optional
+
+
+class MilestoneStreamParser:
+    """Pulls complete milestone objects out of a plan JSON that arrives in chunks.
+
+    Only the top-level "milestones" array is tracked; each object in it is
+    decoded as soon as its closing brace arrives. `result()` decodes the whole
+    document once the stream is finished.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._in_milestones = False
+        self._object_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._text += chunk
+        found: List[Dict[str, Any]] = []
+
+        text = self._text
+        while self._pos < len(text):
+            pos, char = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start:pos]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif char == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._key == "milestones":
+                    self._in_milestones = True
+                elif char == "{" and self._in_milestones and self._depth == 2:
+                    self._object_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._in_milestones and self._depth == 2 and self._object_start is not None:
+                    try:
+                        found.append(json.loads(text[self._object_start:pos + 1]))
+                    except ValueError:
+                        pass
+                    self._object_start = None
+                elif char == "]" and self._in_milestones and self._depth == 1:
+                    self._in_milestones = False
+            elif char == "," and self._depth == 1:
+                self._key = None
+
+        return found
+
+    def result(self) -> Dict[str, Any]:
+        return json.loads(self._text)
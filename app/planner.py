@@ -0,0 +1,117 @@
+import os, heapq
+from typing import Dict, List, Any, Set
+from dotenv import load_dotenv
+
+from .catalog_index import CatalogIndex, tokenize, skill_name
+
+load_dotenv()
+
+PLANNER_MAX_MILESTONES = int(os.getenv("PLANNER_MAX_MILESTONES", "8"))
+PLANNER_RESOURCES_PER_MILESTONE = int(os.getenv("PLANNER_RESOURCES_PER_MILESTONE", "3"))
+
+DIFFICULTY_ORDER = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+
+def _depth(index: CatalogIndex, topic_id: Any) -> int:
+    depth, seen = 0, {topic_id}
+    parent = index.parent_of(topic_id)
+    while parent is not None and parent not in seen:
+        seen.add(parent)
+        depth += 1
+        parent = index.parent_of(parent)
+    return depth
+
+
+def _root(index: CatalogIndex, topic_id: Any) -> Any:
+    seen = {topic_id}
+    parent = index.parent_of(topic_id)
+    while parent is not None and parent in index.topics_by_id and parent not in seen:
+        seen.add(parent)
+        topic_id, parent = parent, index.parent_of(parent)
+    return topic_id
+
+
+def _resources_for(index: CatalogIndex, label: str, goal_scores: Dict[Any, int], used: Set[Any]) -> List[Dict[str, Any]]:
+    terms = tokenize(label)
+    scores = index.match(index.resource_title_postings, terms)
+    for resource_id in scores:
+        scores[resource_id] += goal_scores.get(resource_id, 0)
+
+    picked = heapq.nsmallest(
+        PLANNER_RESOURCES_PER_MILESTONE,
+        (resource_id for resource_id in scores if resource_id not in used),
+        key=lambda resource_id: (-scores[resource_id], str(resource_id)))
+    used.update(picked)
+    return [{"resourceId": resource_id, "why": f"Covers {label}"} for resource_id in picked]
+
+
+def plan_locally(desired_skills: List[str], desired_topics: List[str], index: CatalogIndex) -> Dict[str, Any]:
+    """Builds a plan without the LLM.
+
+    Matched topics are ordered parent before subtopic, each followed by its
+    matched skills from beginner to advanced, and every milestone gets the
+    best matching resources that no earlier milestone used yet.
+    """
+    goal_terms = tokenize(" ".join(desired_skills + desired_topics))
+
+    topic_scores = dict(index.match(index.topic_postings, goal_terms))
+    skill_scores = dict(index.match(index.skill_postings, goal_terms))
+
+    # a matched topic without a matched skill brings in its own skills
+    topics_with_skills = {index.skill_topic.get(skill_id) for skill_id in skill_scores}
+    for topic_id in list(topic_scores):
+        if topic_id not in topics_with_skills:
+            for skill_id in index.skills_by_topic.get(topic_id, ()):
+                skill_scores.setdefault(skill_id, 0)
+
+    skills_by_topic: Dict[Any, List[Any]] = {}
+    for skill_id in skill_scores:
+        topic_id = index.skill_topic.get(skill_id)
+        if topic_id in index.topics_by_id:
+            topic_scores.setdefault(topic_id, 0)
+        else:
+            # skills of topics missing from the catalog go with the topic-less ones
+            topic_id = None
+        skills_by_topic.setdefault(topic_id, []).append(skill_id)
+
+    def group_score(topic_id: Any) -> int:
+        return topic_scores.get(topic_id, 0) + sum(skill_scores[skill_id] for skill_id in skills_by_topic.get(topic_id, ()))
+
+    root_scores: Dict[Any, int] = {}
+    for topic_id in topic_scores:
+        root = _root(index, topic_id)
+        root_scores[root] = root_scores.get(root, 0) + group_score(topic_id)
+
+    ordered_topics = sorted(
+        topic_scores,
+        key=lambda topic_id: (-root_scores[_root(index, topic_id)], str(_root(index, topic_id)),
+                              _depth(index, topic_id), -group_score(topic_id), str(topic_id)))
+
+    steps: List[Dict[str, Any]] = []
+    for topic_id in ordered_topics + [None]:
+        if topic_id is not None and topic_scores[topic_id] > 0:
+            steps.append({"type": "topic", "label": index.topics_by_id[topic_id].get("name"), "topicId": topic_id, "skillId": None})
+        skills = sorted(
+            skills_by_topic.get(topic_id, ()),
+            key=lambda skill_id: (DIFFICULTY_ORDER.get(index.skills_by_id[skill_id].get("difficulty"), 1),
+                                  -skill_scores[skill_id], str(skill_id)))
+        for skill_id in skills:
+            steps.append({"type": "skill", "label": skill_name(index.skills_by_id[skill_id]), "topicId": topic_id, "skillId": skill_id})
+
+    goal_resource_scores = index.match(index.resource_title_postings, goal_terms)
+    used: Set[Any] = set()
+    milestones = []
+    for idx, step in enumerate(steps[:PLANNER_MAX_MILESTONES], start=1):
+        milestones.append({
+            "milestoneId": f"m{idx}",
+            **step,
+            "resources": _resources_for(index, step["label"] or "", goal_resource_scores, used),
+            "status": "pending"
+        })
+
+    if milestones:
+        summary = "Path through " + ", ".join(milestone["label"] for milestone in milestones if milestone["label"])
+    else:
+        summary = "No catalog entries match the requested goals."
+
+    return {"summary": summary, "milestones": milestones, "planner": "local"}
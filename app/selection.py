@@ -0,0 +1,103 @@
+import os, json, heapq
+from typing import Dict, List, Any, Iterable, Optional
+from dotenv import load_dotenv
+from .catalog_index import CatalogIndex, tokenize, skill_name, skill_topic_id
+
+load_dotenv()
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+CHARS_PER_TOKEN = 4
+TOPIC_BUDGET_SHARE = 0.15
+SKILL_BUDGET_SHARE = 0.25
+MAX_RANKED = int(os.getenv("SELECTION_MAX_RANKED", "500"))
+
+
+def topic_payload(topic: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": topic.get("id"), "name": topic.get("name")}
+
+
+def skill_payload(skill: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": skill.get("id"), "name": skill_name(skill), "topicID": skill_topic_id(skill)}
+
+
+def resource_payload(resource: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": resource.get("id"),
+        "title": resource.get("title"),
+        "description": resource.get("description", "")
+    }
+
+
+def estimate_tokens(payload: Any) -> int:
+    return len(json.dumps(payload, ensure_ascii=False)) // CHARS_PER_TOKEN + 1
+
+
+def _take(items: Iterable[Dict[str, Any]], payload, budget: int, picked: List[Dict[str, Any]]) -> int:
+    for item in items:
+        cost = estimate_tokens(payload(item))
+        if cost > budget:
+            break
+        picked.append(item)
+        budget -= cost
+    return budget
+
+
+def _ranked(scores: Dict[Any, int], by_id: Dict[Any, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    ranked = heapq.nlargest(MAX_RANKED, (item_id for item_id in scores if item_id in by_id), key=scores.__getitem__)
+    return [by_id[item_id] for item_id in ranked]
+
+
+def select_candidates(
+    desired_skills: List[str],
+    desired_topics: List[str],
+    index: CatalogIndex,
+    token_budget: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+
+    budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    goal_terms = tokenize(" ".join(desired_skills + desired_topics))
+
+    if not goal_terms:
+        ranked_topics, ranked_skills, ranked_resources = index.topics, index.skills, index.resources
+    else:
+        topic_scores = {topic_id: score * 2 for topic_id, score in index.match(index.topic_postings, goal_terms).items()}
+
+        # a matched topic pulls in its parent and its subtopics
+        for topic_id in list(topic_scores):
+            for related in index.subtopics(topic_id) + [index.parent_of(topic_id)]:
+                if related in index.topics_by_id:
+                    topic_scores.setdefault(related, 1)
+
+        skill_scores = {skill_id: score * 3 for skill_id, score in index.match(index.skill_postings, goal_terms).items()}
+        for topic_id, score in list(topic_scores.items()):
+            for skill_id in index.skills_by_topic.get(topic_id, ()):
+                skill_scores[skill_id] = skill_scores.get(skill_id, 0) + score
+        for skill_id in skill_scores:
+            topic_id = index.skill_topic.get(skill_id)
+            if topic_id in index.topics_by_id:
+                topic_scores.setdefault(topic_id, 1)
+
+        picked_terms = set(goal_terms)
+        for topic_id in topic_scores:
+            picked_terms |= tokenize(index.topics_by_id.get(topic_id, {}).get("name"))
+
+        resource_scores = {resource_id: score * 3 for resource_id, score in index.match(index.resource_title_postings, goal_terms).items()}
+        for postings, terms in (
+            (index.resource_title_postings, picked_terms),
+            (index.resource_description_postings, goal_terms)):
+            for resource_id, score in index.match(postings, terms).items():
+                resource_scores[resource_id] = resource_scores.get(resource_id, 0) + score
+
+        ranked_topics = _ranked(topic_scores, index.topics_by_id)
+        ranked_skills = _ranked(skill_scores, index.skills_by_id)
+        ranked_resources = _ranked(resource_scores, index.resources_by_id)
+
+    # topics and skills get a fixed share so resources are never starved,
+    # whatever they leave unused rolls over to the next stage
+    selected: Dict[str, List[Dict[str, Any]]] = {"topics": [], "skills": [], "resources": []}
+    topic_budget = int(budget * TOPIC_BUDGET_SHARE)
+    skill_budget = int(budget * SKILL_BUDGET_SHARE)
+    left = _take(ranked_topics, topic_payload, topic_budget, selected["topics"])
+    left = _take(ranked_skills, skill_payload, skill_budget + left, selected["skills"])
+    _take(ranked_resources, resource_payload, budget - topic_budget - skill_budget + left, selected["resources"])
+
+    return selected
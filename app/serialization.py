@@ -0,0 +1,67 @@
+import os, json
+from datetime import datetime
+from typing import Dict, List, Any, Type
+from pydantic import BaseModel, TypeAdapter
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used without it
+    orjson = None
+
+load_dotenv()
+
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "").strip() in {"1", "true", "yes", "on"}
+
+# bumped whenever LearningPath changes shape; documents carrying the current
+# value were validated against the model before they were written
+SCHEMA_VERSION = 2
+
+_adapters: Dict[Type[BaseModel], TypeAdapter] = {}
+
+
+def _adapter(model: Type[BaseModel]) -> TypeAdapter:
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    return adapter
+
+
+def canonicalize(doc: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """Returns the document as the model would serialize it, stamped with
+    SCHEMA_VERSION, or the untouched document when it does not validate."""
+    adapter = _adapter(model)
+    try:
+        validated = adapter.validate_python(doc)
+    except ValueError:
+        return doc
+    return {**adapter.dump_python(validated), "schemaVersion": SCHEMA_VERSION}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def prepare(doc: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """Returns a JSON-ready version of a stored document.
+
+    Documents written through canonicalize() with the current schema version
+    go out as they are; anything else is validated and dumped through the
+    cached model adapter, like FastAPI's response_model would.
+    """
+    if doc.pop("schemaVersion", None) == SCHEMA_VERSION:
+        return doc
+    adapter = _adapter(model)
+    return adapter.dump_python(adapter.validate_python(doc))
+
+
+def dump_documents(docs: List[Dict[str, Any]], model: Type[BaseModel]) -> bytes:
+    return dumps([prepare(doc, model) for doc in docs])
@@ -0,0 +1,147 @@
+import os, gzip, json, asyncio, logging
+from typing import Dict, List, Any, Optional
+from dotenv import load_dotenv
+from bson import Binary
+
+from . import db
+from .clients import catalog_cache, catalog_syncs, TOPICS_API_BASE_URL, RESOURCES_API_BASE_URL
+from .catalog_index import catalog_index
+from .serialization import dumps
+from .helpers import now_dt
+
+load_dotenv()
+
+# "mongo", "file" or "off"; a new replica only finds a file snapshot when
+# CATALOG_SNAPSHOT_PATH is on a shared or persistent volume
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "mongo").strip().lower()
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "catalog_snapshot.json.gz")
+
+SNAPSHOT_ID = "catalog"
+# a snapshot is one BSON document, capped at 16 MB; leaves room for the other fields
+MONGO_SNAPSHOT_MAX_BYTES = 16 * 1024 * 1024 - 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+state: Dict[str, Any] = {"version": None, "savedAt": None, "restoredVersion": None}
+_saving: Optional[asyncio.Task] = None
+
+
+def _cache_keys() -> Dict[str, str]:
+    return {
+        "topics": f"{TOPICS_API_BASE_URL}/topics",
+        "skills": f"{TOPICS_API_BASE_URL}/skills",
+        "resources": f"{RESOURCES_API_BASE_URL}/resources",
+    }
+
+
+def _encode(snapshot: Dict[str, Any]) -> bytes:
+    return gzip.compress(dumps(snapshot), compresslevel=5)
+
+
+def _decode(raw: bytes) -> Dict[str, Any]:
+    return json.loads(gzip.decompress(raw))
+
+
+def _write_file(raw: bytes) -> None:
+    tmp = f"{CATALOG_SNAPSHOT_PATH}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(raw)
+    os.replace(tmp, CATALOG_SNAPSHOT_PATH)
+
+
+def _read_file() -> Optional[bytes]:
+    try:
+        with open(CATALOG_SNAPSHOT_PATH, "rb") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        return None
+
+
+async def save_snapshot(catalog: Dict[str, List[Dict[str, Any]]], version: str) -> None:
+    """Writes the catalog as gzipped JSON to CATALOG_SNAPSHOT_PATH or to one Mongo document."""
+    snapshot = {
+        "version": version,
+        "savedAt": now_dt().isoformat(),
+        # copies of the lists, an incremental sync may patch them while the thread encodes
+        "catalog": {name: list(items) for name, items in catalog.items()},
+        "etags": {name: sync.etags.get(None) for name, sync in catalog_syncs.items()},
+    }
+    raw = await asyncio.to_thread(_encode, snapshot)
+
+    if CATALOG_SNAPSHOT == "mongo":
+        if len(raw) > MONGO_SNAPSHOT_MAX_BYTES:
+            raise ValueError(f"snapshot of {len(raw)} bytes does not fit in one Mongo document, "
+                             "use CATALOG_SNAPSHOT=file on a shared volume")
+        await db.catalog_snapshots.replace_one(
+            {"_id": SNAPSHOT_ID},
+            {"_id": SNAPSHOT_ID, "version": version, "savedAt": now_dt(), "data": Binary(raw)},
+            upsert=True)
+    else:
+        await asyncio.to_thread(_write_file, raw)
+
+    state.update(version=version, savedAt=snapshot["savedAt"])
+    logger.info("catalog snapshot %s saved, %d bytes", version[:12], len(raw))
+
+
+async def _load_raw() -> Optional[bytes]:
+    if CATALOG_SNAPSHOT == "mongo":
+        doc = await db.catalog_snapshots.find_one({"_id": SNAPSHOT_ID})
+        return bytes(doc["data"]) if doc else None
+    return await asyncio.to_thread(_read_file)
+
+
+async def restore_snapshot() -> bool:
+    """Loads the last saved catalog into the index and the catalog cache.
+
+    The index is built off the event loop, like on any catalog refresh.
+    The cache entries are stored as stale, so the first request is served
+    from the snapshot right away and triggers a background refresh.
+    """
+    if CATALOG_SNAPSHOT == "off":
+        return False
+
+    raw = await _load_raw()
+    if raw is None:
+        return False
+    snapshot = await asyncio.to_thread(_decode, raw)
+    catalog = snapshot["catalog"]
+
+    for name, key in _cache_keys().items():
+        sync = catalog_syncs.get(name)
+        if sync is not None:
+            sync.restore(catalog[name], snapshot.get("etags", {}).get(name))
+            catalog[name] = sync.items
+        catalog_cache.seed(key, catalog[name])
+
+    await catalog_index.refresh(catalog)
+    if catalog_index.version != snapshot.get("version"):
+        logger.warning("catalog snapshot version %s does not match its contents", snapshot.get("version"))
+    state.update(version=catalog_index.version, savedAt=snapshot.get("savedAt"), restoredVersion=catalog_index.version)
+    logger.info("catalog snapshot %s restored", catalog_index.version[:12])
+    return True
+
+
+def schedule_snapshot(catalog: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Saves the catalog in the background when the index version moved on since the last save."""
+    global _saving
+    if CATALOG_SNAPSHOT == "off" or catalog_index.version == state["version"]:
+        return
+    if _saving is not None and not _saving.done():
+        return
+
+    async def save():
+        try:
+            await save_snapshot(catalog, catalog_index.version)
+        except Exception as e:
+            logger.warning("could not save catalog snapshot: %s", e)
+
+    _saving = asyncio.create_task(save())
+
+
+async def flush_snapshot() -> None:
+    if _saving is not None and not _saving.done():
+        await _saving
+
+
+def snapshot_stats() -> Dict[str, Any]:
+    return {"backend": CATALOG_SNAPSHOT, **state}
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Per-document CPU cost of serializing GET /paths responses.
+
+Compares what FastAPI does with response_model=List[LearningPath]
+(validate every document, dump it, encode JSON) against the
+FAST_SERIALIZATION path (documents canonicalized on write go out as-is).
+
+Env:
+  BENCH_DOCS          default: 200   documents per response
+  BENCH_MILESTONES    default: 6     milestones per document
+  BENCH_ROUNDS        default: 50    responses serialized per variant
+
+Usage:
+  python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from starlette.responses import JSONResponse
+
+from app.models import LearningPath
+from app.serialization import canonicalize, dump_documents, orjson
+
+BENCH_DOCS = int(os.getenv("BENCH_DOCS", "200"))
+BENCH_MILESTONES = int(os.getenv("BENCH_MILESTONES", "6"))
+BENCH_ROUNDS = int(os.getenv("BENCH_ROUNDS", "50"))
+
+
+def build_doc(i: int) -> Dict[str, Any]:
+    created = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return {
+        "pathId": f"lp-{i:08d}",
+        "userId": f"user-{i % 97}",
+        "goals": {"skills": ["Flexbox", "Grid Layout"], "topics": ["CSS Basics"]},
+        "summary": "A short path from CSS layout basics to responsive grids.",
+        "milestones": [{
+            "milestoneId": f"m{m}",
+            "type": "skill" if m % 2 else "topic",
+            "label": f"Milestone {m}",
+            "skillId": f"s-{m}",
+            "topicId": f"t-{m}",
+            "resources": [{"resourceId": f"r-{m}-{r}", "why": "Covers the basics with examples."} for r in range(3)],
+            "status": "pending"
+        } for m in range(1, BENCH_MILESTONES + 1)],
+        "status": "done",
+        "createdAt": created,
+        "updatedAt": created
+    }
+
+
+def fresh(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # every request reads new dicts from Mongo
+    return [dict(doc) for doc in docs]
+
+
+def bench(label: str, fn, docs: List[Dict[str, Any]]) -> float:
+    started = time.perf_counter()
+    for _ in range(BENCH_ROUNDS):
+        fn(fresh(docs))
+    elapsed = time.perf_counter() - started
+    per_doc_us = elapsed / (BENCH_ROUNDS * len(docs)) * 1e6
+    print(f"{label:<34} {per_doc_us:8.2f} us/doc   {elapsed / BENCH_ROUNDS * 1e3:8.2f} ms/response")
+    return per_doc_us
+
+
+def main() -> None:
+    raw = [build_doc(i) for i in range(BENCH_DOCS)]
+    stored = [canonicalize(doc, LearningPath) for doc in raw]
+    field = create_model_field(name="Response_list_paths", type_=List[LearningPath], mode="serialization")
+
+    loop = asyncio.new_event_loop()
+
+    def response_model(docs):
+        # what FastAPI runs for a route with response_model after the handler returns
+        content = loop.run_until_complete(serialize_response(field=field, response_content=docs))
+        return JSONResponse(content).body
+
+    print(f"{BENCH_DOCS} docs x {BENCH_MILESTONES} milestones, {BENCH_ROUNDS} rounds, orjson={'yes' if orjson else 'no'}")
+    slow = bench("response_model=List[LearningPath]", response_model, stored)
+    fast = bench("FAST_SERIALIZATION (canonical)", lambda docs: dump_documents(docs, LearningPath), stored)
+    legacy = bench("FAST_SERIALIZATION (legacy docs)", lambda docs: dump_documents(docs, LearningPath), raw)
+    loop.close()
+    print(f"saved per document: {slow - fast:.2f} us ({slow / fast:.1f}x), legacy documents: {slow / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of the hot endpoints against local stand-ins.
+
+Starts benchmarks.stubs (catalog APIs + fake OpenAI) and the service itself
+with uvicorn, then drives POST /generate, GET /paths and GET /paths/{pathId}
+with a fixed number of concurrent clients and prints requests/sec and
+p50/p95/p99 per endpoint.
+
+Mongo has to be reachable at MONGO_URI (a throwaway local instance, e.g.
+`docker compose up mongo-lpg`); mongomock cannot stand in for pymongo's
+AsyncMongoClient. Paths are written to MONGO_DB, default learning_paths_bench.
+
+Env:
+  BENCH_REQUESTS        default: 500     requests per endpoint
+  BENCH_CONCURRENCY     default: 20      concurrent clients
+  BENCH_DISTINCT_GOALS  default: 50      distinct goal sets sent to /generate (plan cache hit rate)
+  BENCH_TARGET          default: ""      base URL of an already running service; skips spawning
+  BENCH_APP_PORT        default: 8099
+  STUB_*                see benchmarks/stubs.py
+
+Usage:
+  python -m benchmarks.load_test
+"""
+
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+BENCH_REQUESTS = int(os.getenv("BENCH_REQUESTS", "500"))
+BENCH_CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "20"))
+BENCH_DISTINCT_GOALS = int(os.getenv("BENCH_DISTINCT_GOALS", "50"))
+BENCH_TARGET = os.getenv("BENCH_TARGET", "").rstrip("/")
+BENCH_APP_PORT = int(os.getenv("BENCH_APP_PORT", "8099"))
+STUB_PORT = int(os.getenv("STUB_PORT", "5099"))
+
+SUBJECTS = ["CSS", "JavaScript", "Python", "SQL", "Docker", "Kubernetes", "Pandas", "Security", "Testing", "AWS"]
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest rank
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(share * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def report(label: str, latencies: List[float], errors: int, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    rps = len(latencies) / elapsed if elapsed else 0.0
+    print(f"{label:<20} {rps:8.1f} req/s   p50 {percentile(latencies, 0.50) * 1e3:8.1f} ms   "
+          f"p95 {percentile(latencies, 0.95) * 1e3:8.1f} ms   p99 {percentile(latencies, 0.99) * 1e3:8.1f} ms   "
+          f"errors {errors}")
+
+
+async def run(label: str, request: Callable[[int], Awaitable[httpx.Response]]) -> List[httpx.Response]:
+    """Sends BENCH_REQUESTS requests from BENCH_CONCURRENCY workers; only 2xx count as samples."""
+    latencies: List[float] = []
+    responses: List[httpx.Response] = []
+    errors = 0
+    counter = iter(range(BENCH_REQUESTS))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(i)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            if response.is_success:
+                latencies.append(time.perf_counter() - started)
+                responses.append(response)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(BENCH_CONCURRENCY)))
+    report(label, latencies, errors, time.perf_counter() - started)
+    return responses
+
+
+def goals(i: int) -> Dict[str, object]:
+    n = i % BENCH_DISTINCT_GOALS
+    return {"userId": f"bench-{i % 97}", "desiredSkills": [f"{SUBJECTS[n % len(SUBJECTS)]} {n}"], "desiredTopics": []}
+
+
+async def bench(base_url: str) -> None:
+    limits = httpx.Limits(max_connections=BENCH_CONCURRENCY, max_keepalive_connections=BENCH_CONCURRENCY)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        print(f"{BENCH_REQUESTS} requests per endpoint, {BENCH_CONCURRENCY} concurrent clients, "
+              f"{BENCH_DISTINCT_GOALS} distinct goal sets")
+
+        generated = await run("POST /generate", lambda i: client.post("/generate", json=goals(i)))
+        path_ids = [response.json()["pathId"] for response in generated]
+        if not path_ids:
+            sys.exit("no path was generated, check the service log")
+
+        await run("GET /paths", lambda i: client.get("/paths", params={"limit": 50}))
+        await run("GET /paths/{pathId}", lambda i: client.get(f"/paths/{path_ids[i % len(path_ids)]}"))
+
+
+def spawn(module: str, env: Dict[str, str], port: int) -> subprocess.Popen:
+    if module.startswith("app."):
+        command = [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", module]
+    return subprocess.Popen(command, env=env)
+
+
+def wait_for(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:g}s")
+
+
+def main() -> None:
+    if BENCH_TARGET:
+        asyncio.run(bench(BENCH_TARGET))
+        return
+
+    stub_url = f"http://127.0.0.1:{STUB_PORT}"
+    env = {
+        **os.environ,
+        "TOPICS_API_BASE_URL": stub_url,
+        "RESOURCES_API_BASE_URL": stub_url,
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_KEY": "bench",
+        "MONGO_DB": os.getenv("MONGO_DB", "learning_paths_bench"),
+    }
+
+    processes: List[subprocess.Popen] = []
+    try:
+        processes.append(spawn("benchmarks.stubs", env, STUB_PORT))
+        wait_for(f"{stub_url}/topics")
+        processes.append(spawn("app.main", env, BENCH_APP_PORT))
+        app_url = f"http://127.0.0.1:{BENCH_APP_PORT}"
+        # startup waits for Mongo to build indexes
+        wait_for(f"{app_url}/", timeout=60)
+
+        health = httpx.get(f"{app_url}/healthz", timeout=10)
+        if not health.is_success:
+            sys.exit(f"Mongo is not reachable at {os.getenv('MONGO_URI', 'the default MONGO_URI')}: {health.text}")
+
+        asyncio.run(bench(app_url))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
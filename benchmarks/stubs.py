@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the upstream services, for load tests.
+
+Serves the topics-skills API (/topics, /skills), the resource catalog API
+(/resources) and an OpenAI-compatible /v1/chat/completions from one process.
+The fake LLM answers with a plan built from the IDs in the prompt, so the
+generated paths survive plan validation.
+
+Env:
+  STUB_PORT           default: 5099
+  STUB_CATALOG_DIR    default: ""      serve topics/skills/resources .json or .ndjson files
+                                       from data/generate_catalog.py instead of STUB_TOPICS...
+  STUB_TOPICS         default: 200     topics in the catalog
+  STUB_SKILLS         default: 1000    skills in the catalog
+  STUB_RESOURCES      default: 5000    resources in the catalog
+  STUB_LATENCY_MS     default: 20      added to every catalog response
+  STUB_LLM_DELAY_MS   default: 800     added to every chat completion
+
+Usage:
+  python -m benchmarks.stubs
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Any
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+STUB_PORT = int(os.getenv("STUB_PORT", "5099"))
+STUB_CATALOG_DIR = os.getenv("STUB_CATALOG_DIR", "")
+STUB_TOPICS = int(os.getenv("STUB_TOPICS", "200"))
+STUB_SKILLS = int(os.getenv("STUB_SKILLS", "1000"))
+STUB_RESOURCES = int(os.getenv("STUB_RESOURCES", "5000"))
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "20"))
+STUB_LLM_DELAY_MS = float(os.getenv("STUB_LLM_DELAY_MS", "800"))
+
+SUBJECTS = ["CSS", "JavaScript", "Python", "SQL", "Docker", "Kubernetes", "Pandas", "Security", "Testing", "AWS"]
+ASPECTS = ["Layout", "Modules", "Typing", "Joins", "Images", "Deployments", "Aggregation", "OWASP", "Mocking", "IAM"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+FORMATS = ["Article", "Video", "Course", "Book"]
+
+
+def build_catalog(topics: int, skills: int, resources: int) -> Dict[str, List[Dict[str, Any]]]:
+    """A deterministic catalog; every tenth topic is a root, the rest hang below one."""
+    topic_items = [{
+        "id": f"t-{i}",
+        "name": f"{SUBJECTS[i % len(SUBJECTS)]} {ASPECTS[i // len(SUBJECTS) % len(ASPECTS)]} {i}",
+        "parentId": None if i % 10 == 0 else f"t-{i - i % 10}"
+    } for i in range(topics)]
+    skill_items = [{
+        "id": f"s-{i}",
+        "skill": f"{ASPECTS[i % len(ASPECTS)]} in {SUBJECTS[i // len(ASPECTS) % len(SUBJECTS)]} {i}",
+        "topicID": f"t-{i % max(topics, 1)}",
+        "difficulty": LEVELS[i % len(LEVELS)]
+    } for i in range(skills)]
+    resource_items = [{
+        "_id": f"r-{i}",
+        "title": f"{SUBJECTS[i % len(SUBJECTS)]}: {ASPECTS[i // len(SUBJECTS) % len(ASPECTS)]} — {FORMATS[i % len(FORMATS)]}",
+        "description": f"Hands-on material #{i}."
+    } for i in range(resources)]
+    return {"topics": topic_items, "skills": skill_items, "resources": resource_items}
+
+
+def load_catalog(directory: str) -> Dict[str, List[Dict[str, Any]]]:
+    catalog = {}
+    for name in ("topics", "skills", "resources"):
+        path = os.path.join(directory, f"{name}.ndjson")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                catalog[name] = [json.loads(line) for line in fh if line.strip()]
+        else:
+            with open(os.path.join(directory, f"{name}.json"), encoding="utf-8") as fh:
+                catalog[name] = json.load(fh)
+    return catalog
+
+
+def fake_plan(payload: Dict[str, Any]) -> Dict[str, Any]:
+    skills = payload.get("skills", [])[:6]
+    resources = payload.get("resources", [])
+    return {
+        "summary": "Stub plan",
+        "milestones": [{
+            "milestoneId": f"m{idx}",
+            "type": "skill",
+            "label": skill.get("name"),
+            "skillId": skill.get("id"),
+            "topicId": skill.get("topicID"),
+            "resources": [{"resourceId": resource.get("id"), "why": "stub"} for resource in resources[idx - 1:idx + 1]],
+            "status": "pending"
+        } for idx, skill in enumerate(skills, start=1)]
+    }
+
+
+def create_app(catalog: Dict[str, List[Dict[str, Any]]]) -> FastAPI:
+    app = FastAPI(title="benchmark stubs")
+    bodies = {name: json.dumps(items).encode("utf-8") for name, items in catalog.items()}
+
+    async def catalog_response(name: str) -> Response:
+        await asyncio.sleep(STUB_LATENCY_MS / 1000)
+        return Response(bodies[name], media_type="application/json")
+
+    @app.get("/topics")
+    async def topics():
+        return await catalog_response("topics")
+
+    @app.get("/skills")
+    async def skills():
+        return await catalog_response("skills")
+
+    @app.get("/resources")
+    async def resources():
+        return await catalog_response("resources")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(STUB_LLM_DELAY_MS / 1000)
+
+        prompt = body["messages"][-1]["content"]
+        content = json.dumps(fake_plan(json.loads(prompt)))
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                 "total_tokens": (len(prompt) + len(content)) // 4}
+        base = {"id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": body.get("model")}
+
+        if not body.get("stream"):
+            return {**base, "usage": usage, "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]}
+
+        def events():
+            for start in range(0, len(content), 64):
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                    {"index": 0, "finish_reason": None, "delta": {"content": content[start:start + 64]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    if STUB_CATALOG_DIR:
+        catalog = load_catalog(STUB_CATALOG_DIR)
+    else:
+        catalog = build_catalog(STUB_TOPICS, STUB_SKILLS, STUB_RESOURCES)
+    sizes = {name: len(items) for name, items in catalog.items()}
+    print(f"stubs on :{STUB_PORT} with {sizes['topics']} topics, {sizes['skills']} skills, {sizes['resources']} resources, "
+          f"catalog latency {STUB_LATENCY_MS:g} ms, LLM delay {STUB_LLM_DELAY_MS:g} ms")
+    uvicorn.run(create_app(catalog), host="127.0.0.1", port=STUB_PORT, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
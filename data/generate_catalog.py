@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic catalog of production size straight to files.
+
+Topics form a tree below the PARENT_TOPICS roots, skills hang off topics
+generated from their own SKILLS_TEMPLATES subtopic and resources are spread
+over the THEMES of the seed scripts. The same settings
+always produce byte-identical files. Items have the shape the upstream APIs
+return, so benchmarks.stubs can serve them as they are (STUB_CATALOG_DIR).
+
+Env:
+  CATALOG_SCALE        default: 10000   resources; topics and skills follow from it
+  CATALOG_TOPICS       default: CATALOG_SCALE / 50
+  CATALOG_SKILLS       default: CATALOG_SCALE / 5
+  CATALOG_RESOURCES    default: CATALOG_SCALE
+  CATALOG_BRANCHING    default: 8       children per topic in the tree
+  CATALOG_SEED         default: 42
+  CATALOG_FORMAT       default: json    json | ndjson
+  CATALOG_OUT_DIR      default: catalog
+
+Usage:
+  CATALOG_SCALE=1000000 CATALOG_FORMAT=ndjson python generate_catalog.py
+"""
+
+import os
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from seed_topics_skills import PARENT_TOPICS, SUBTOPICS, SKILLS_TEMPLATES, DIFFICULTY
+from seed_resources import THEMES, TYPES, AUTHORS
+
+CATALOG_SCALE = int(os.getenv("CATALOG_SCALE", "10000"))
+CATALOG_TOPICS = int(os.getenv("CATALOG_TOPICS", str(max(len(PARENT_TOPICS), CATALOG_SCALE // 50))))
+CATALOG_SKILLS = int(os.getenv("CATALOG_SKILLS", str(max(1, CATALOG_SCALE // 5))))
+CATALOG_RESOURCES = int(os.getenv("CATALOG_RESOURCES", str(CATALOG_SCALE)))
+CATALOG_BRANCHING = int(os.getenv("CATALOG_BRANCHING", "8"))
+CATALOG_SEED = int(os.getenv("CATALOG_SEED", "42"))
+CATALOG_FORMAT = os.getenv("CATALOG_FORMAT", "json").strip().lower()
+CATALOG_OUT_DIR = os.getenv("CATALOG_OUT_DIR", "catalog")
+
+SUBTOPIC_NAMES = list(SKILLS_TEMPLATES)
+SKILL_NAMES = [name for names in SKILLS_TEMPLATES.values() for name in names]
+# the SKILLS_TEMPLATES key (= subtopic name) of each entry in SKILL_NAMES
+SKILL_SUBTOPICS = [sub_name for sub_name, names in SKILLS_TEMPLATES.items() for _ in names]
+# appended to template names so large catalogs don't collapse onto a few hundred distinct names
+QUALIFIERS = ["Essentials", "in Practice", "Deep Dive", "Patterns", "Pitfalls", "for Teams",
+              "at Scale", "Recipes", "Internals", "Case Studies", "Workshop", "Refresher"]
+EPOCH = datetime(2023, 1, 1)
+
+
+def iso(dt: datetime) -> str:
+    return dt.replace(microsecond=0).isoformat() + "Z"
+
+
+def stamp(rng: random.Random) -> str:
+    return iso(EPOCH + timedelta(seconds=rng.randrange(0, 2 * 365 * 24 * 3600)))
+
+
+def topic_parent(i: int) -> int:
+    # the first topics are the roots, everything else fills a CATALOG_BRANCHING-ary tree below them
+    roots = len(PARENT_TOPICS)
+    return (i - roots) // CATALOG_BRANCHING
+
+
+def topics(rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for i in range(CATALOG_TOPICS):
+        if i < len(PARENT_TOPICS):
+            name, description = PARENT_TOPICS[i]
+            yield {"id": f"t-{i}", "name": name, "description": description, "parentId": None, "updatedAt": stamp(rng)}
+            continue
+        base = SUBTOPIC_NAMES[i % len(SUBTOPIC_NAMES)]
+        qualifier = QUALIFIERS[rng.randrange(len(QUALIFIERS))]
+        yield {
+            "id": f"t-{i}",
+            "name": f"{base} {qualifier} {i}",
+            "description": f"{base} with a focus on {qualifier.lower()}",
+            "parentId": f"t-{topic_parent(i)}",
+            "updatedAt": stamp(rng)
+        }
+
+
+def skill_topics() -> Dict[str, List[int]]:
+    """Subtopic name -> the topics generated from it, or its parent root when there are none."""
+    by_name: Dict[str, List[int]] = {}
+    for i in range(len(PARENT_TOPICS), CATALOG_TOPICS):
+        by_name.setdefault(SUBTOPIC_NAMES[i % len(SUBTOPIC_NAMES)], []).append(i)
+    roots = {name: i for i, (name, _) in enumerate(PARENT_TOPICS)}
+    for parent_name, sub_names in SUBTOPICS.items():
+        for sub_name in sub_names:
+            by_name.setdefault(sub_name, [roots[parent_name]])
+    return by_name
+
+
+def skills(rng: random.Random) -> Iterator[Dict[str, Any]]:
+    # a skill hangs off a topic named after its own template, so hierarchy lookups stay on subject
+    topic_choices = skill_topics()
+    for i in range(CATALOG_SKILLS):
+        choices = topic_choices[SKILL_SUBTOPICS[i % len(SKILL_SUBTOPICS)]]
+        yield {
+            "id": f"s-{i}",
+            "name": f"{SKILL_NAMES[i % len(SKILL_NAMES)]} {QUALIFIERS[rng.randrange(len(QUALIFIERS))]}",
+            "topicId": f"t-{choices[rng.randrange(len(choices))]}",
+            "difficulty": DIFFICULTY[rng.randrange(len(DIFFICULTY))],
+            "updatedAt": stamp(rng)
+        }
+
+
+def resources(rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for i in range(CATALOG_RESOURCES):
+        theme = THEMES[i % len(THEMES)]
+        tag = theme["tags"][rng.randrange(len(theme["tags"]))]
+        rtype = TYPES[rng.randrange(len(TYPES))]
+        created_at = stamp(rng)
+        yield {
+            "_id": f"r-{i}",
+            "title": f"{theme['k']}: {tag} — {rtype} {i}",
+            "type": rtype,
+            "description": f"A {rtype.lower()} covering {theme['k']} with focus on {tag}.",
+            "authorId": AUTHORS[rng.randrange(len(AUTHORS))],
+            "createdAt": created_at,
+            "updatedAt": max(created_at, stamp(rng))
+        }
+
+
+def write(name: str, items: Iterator[Dict[str, Any]]) -> str:
+    path = os.path.join(CATALOG_OUT_DIR, f"{name}.{CATALOG_FORMAT}")
+    with open(path, "w", encoding="utf-8") as fh:
+        if CATALOG_FORMAT == "ndjson":
+            for item in items:
+                fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+        else:
+            # streamed so 10^6 items never sit in memory as one list
+            fh.write("[")
+            for idx, item in enumerate(items):
+                fh.write(("," if idx else "") + json.dumps(item, ensure_ascii=False))
+            fh.write("]")
+    return path
+
+
+def generate() -> None:
+    if CATALOG_FORMAT not in {"json", "ndjson"}:
+        raise SystemExit(f"CATALOG_FORMAT must be json or ndjson, not {CATALOG_FORMAT!r}")
+    os.makedirs(CATALOG_OUT_DIR, exist_ok=True)
+
+    # one seeded generator per file, so a file does not depend on the order they are written in
+    for name, count, build in (("topics", CATALOG_TOPICS, topics),
+                               ("skills", CATALOG_SKILLS, skills),
+                               ("resources", CATALOG_RESOURCES, resources)):
+        started = time.perf_counter()
+        path = write(name, build(random.Random(f"{CATALOG_SEED}:{name}")))
+        elapsed = time.perf_counter() - started
+        print(f"{path}: {count} items, {os.path.getsize(path) / 1e6:.1f} MB, {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    generate()
@@ -5,29 +5,35 @@ Seed the Resources API with randomized demo resources.
 Env:
   RESOURCES_API_BASE_URL   default: http://localhost:5002
   COUNT_PER_THEME          default: 10
-  SLEEP_BETWEEN_MS         default: 20 (ms)   tiny delay between requests
+  SLEEP_BETWEEN_MS         default: 0 (ms)    spacing between requests, same as SEED_RATE_LIMIT=1000/ms
   START_DATE_ISO           default: 2023-01-01 (random dates start)
   DRY_RUN                  default: ""  (set to "1" to only print payloads)
+  SEED_PROGRESS_FILE       default: seed_resources.progress.jsonl   delete it to seed again from scratch
+  SEED_BULK_ENDPOINT       default: ""  (e.g. /resources/bulk, takes a JSON array)
+  SEED_CONCURRENCY, SEED_RATE_LIMIT, SEED_RETRIES, SEED_BULK_SIZE   see seeding.py
 
 Usage:
-  python seed_resources_api.py
+  python seed_resources.py
 """
 
 import os
 import random
-import time
+import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List
-import requests
+from typing import Dict, List, Tuple
+
+from seeding import Seeder, Progress, SEED_RATE_LIMIT
 
 # -----------------------------
 # Config
 # -----------------------------
 RESOURCES_API_BASE = os.getenv("RESOURCES_API_BASE_URL", "http://localhost:5002").rstrip("/")
 COUNT_PER_THEME = int(os.getenv("COUNT_PER_THEME", "10"))
-SLEEP_BETWEEN_MS = int(os.getenv("SLEEP_BETWEEN_MS", "20"))
+SLEEP_BETWEEN_MS = int(os.getenv("SLEEP_BETWEEN_MS", "0"))
 START_DATE_ISO = os.getenv("START_DATE_ISO", "2023-01-01")
 DRY_RUN = os.getenv("DRY_RUN", "").strip() in {"1", "true", "yes", "on"}
+SEED_PROGRESS_FILE = os.getenv("SEED_PROGRESS_FILE", "seed_resources.progress.jsonl")
+SEED_BULK_ENDPOINT = os.getenv("SEED_BULK_ENDPOINT", "").strip()
 
 # Endpoint (adjust if your router is different)
 RESOURCES_ENDPOINT = f"{RESOURCES_API_BASE}/resources"
@@ -104,41 +110,43 @@ def build_resource(theme_key: str, tag: str) -> Dict:
     }
 
 
-def post_json(url: str, payload: Dict) -> Dict:
-    r = requests.post(url, json=payload, timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-
 # -----------------------------
 # Seeding
 # -----------------------------
-def seed_resources() -> None:
-    print(f"Using Resources API at: {RESOURCES_API_BASE}")
-    print(f"POST -> {RESOURCES_ENDPOINT}")
-
-    total = 0
+def build_payloads() -> List[Tuple[str, Dict]]:
+    # keyed by position; with the fixed random seed a rerun builds the same list
+    payloads = []
     for theme in THEMES:
         for _ in range(COUNT_PER_THEME):
             tag = rand(theme["tags"])
-            payload = build_resource(theme["k"], tag)
+            payloads.append((f"resource:{len(payloads)}", build_resource(theme["k"], tag)))
+    return payloads
+
+
+async def seed_resources() -> None:
+    print(f"Using Resources API at: {RESOURCES_API_BASE}")
+    print(f"POST -> {RESOURCES_ENDPOINT}")
 
-            if DRY_RUN:
-                print("[DRY RUN] Would POST:", payload)
-            else:
-                data = post_json(RESOURCES_ENDPOINT, payload)
-                # Expecting API returns created resource JSON with an 'id' (mapped from Mongo _id)
-                rid = data.get("id") or data.get("_id") or "<?>"
-                print(f"Created resource: {rid} — {payload['title']}")
+    payloads = build_payloads()
+    if DRY_RUN:
+        for _, payload in payloads:
+            print("[DRY RUN] Would POST:", payload)
+        print(f"Total resources: {len(payloads)}")
+        return
 
-            total += 1
-            if SLEEP_BETWEEN_MS > 0:
-                time.sleep(SLEEP_BETWEEN_MS / 1000.0)
+    rate = SEED_RATE_LIMIT or (1000.0 / SLEEP_BETWEEN_MS if SLEEP_BETWEEN_MS > 0 else 0)
+    bulk = f"{RESOURCES_API_BASE}{SEED_BULK_ENDPOINT}" if SEED_BULK_ENDPOINT else None
+    progress = Progress(SEED_PROGRESS_FILE)
+    try:
+        async with Seeder(RESOURCES_ENDPOINT, progress, bulk_endpoint=bulk, rate=rate) as seeder:
+            await seeder.seed(payloads)
+    finally:
+        progress.close()
 
-    print(f"Total resources created: {total}")
+    print(f"Total resources seeded: {sum(1 for key in progress.done if key.startswith('resource:'))} of {len(payloads)}")
 
 
 if __name__ == "__main__":
     # Uncomment for reproducible runs
     random.seed(42)
-    seed_resources()
+    asyncio.run(seed_resources())
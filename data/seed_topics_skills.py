@@ -1,13 +1,18 @@
 import os
 import random
-import time
-from datetime import datetime
-import requests
+import asyncio
+
+from seeding import Seeder, Progress
 
 # -----------------------------
 # Configuration
 # -----------------------------
 TOPICS_API_BASE = os.getenv("TOPICS_API_BASE", "http://localhost:5000").rstrip("/")
+# created topics/skills are recorded here; a rerun only creates what is missing
+SEED_PROGRESS_FILE = os.getenv("SEED_PROGRESS_FILE", "seed_topics_skills.progress.jsonl")
+# e.g. /topics/bulk and /skills/bulk if the Topics API accepts JSON arrays
+SEED_TOPICS_BULK_ENDPOINT = os.getenv("SEED_TOPICS_BULK_ENDPOINT", "").strip()
+SEED_SKILLS_BULK_ENDPOINT = os.getenv("SEED_SKILLS_BULK_ENDPOINT", "").strip()
 PARENT_TOPICS = [
     ("Web Development Fundamentals", "Core concepts: HTML, CSS, JS."),
     ("Python Programming", "Python syntax, data structures, OOP, tooling."),
@@ -236,59 +241,59 @@ SKILLS_TEMPLATES = {
 
 DIFFICULTY = ["beginner", "intermediate", "advanced"]
 
-def post_json(url, payload):
-    r = requests.post(url, json=payload, timeout=10)
-    r.raise_for_status()
-    return r.json()
+def bulk_url(path):
+    return f"{TOPICS_API_BASE}{path}" if path else None
 
-def seed():
+async def seed():
     print(f"Using Topics API at: {TOPICS_API_BASE}")
+    progress = Progress(SEED_PROGRESS_FILE)
+    try:
+        async with Seeder(f"{TOPICS_API_BASE}/topics", progress, bulk_url(SEED_TOPICS_BULK_ENDPOINT)) as topics:
+            # 1) Create parent topics
+            ids = await topics.seed(
+                (f"topic:{name}", {"name": name, "description": desc}) for name, desc in PARENT_TOPICS
+            )
 
-    # 1) Create parent topics
-    parent_id_map = {}
-    for name, desc in PARENT_TOPICS:
-        t = post_json(f"{TOPICS_API_BASE}/topics", {
-            "name": name,
-            "description": desc
-        })
-        parent_id_map[name] = t["id"]
-        print("Created parent topic:", name)
-
-    # 2) Create subtopics (children) under each parent
-    subtopic_ids = {}  # name -> id
-    total_topics = 0
-    for parent_name, sub_list in SUBTOPICS.items():
-        for sub_name in sub_list:
-            t = post_json(f"{TOPICS_API_BASE}/topics", {
-                "name": sub_name,
-                "description": f"{sub_name} under {parent_name}",
-                "parentId": parent_id_map[parent_name]
-            })
-            subtopic_ids[sub_name] = t["id"]
-            total_topics += 1
-            print(f"  Created subtopic: {sub_name}")
+            # 2) Create subtopics (children) under each parent, once the parents exist
+            subtopics = []
+            for parent_name, sub_list in SUBTOPICS.items():
+                parent_id = ids.get(f"topic:{parent_name}")
+                if parent_id is None:
+                    print(f"Skipping subtopics of {parent_name}: parent was not created")
+                    continue
+                for sub_name in sub_list:
+                    subtopics.append((f"topic:{sub_name}", {
+                        "name": sub_name,
+                        "description": f"{sub_name} under {parent_name}",
+                        "parentId": parent_id
+                    }))
+            ids = await topics.seed(subtopics)
 
-    print(f"Total topics (parents + subtopics): {len(PARENT_TOPICS) + total_topics}")
+        print(f"Total topics (parents + subtopics): {sum(1 for key in ids if key.startswith('topic:'))}")
 
-    # 3) Create skills per subtopic (2–4 each)
-    total_skills = 0
-    for sub_name, skill_names in SKILLS_TEMPLATES.items():
-        k = random.randint(2, min(4, len(skill_names)))
-        chosen = random.sample(skill_names, k)
-        for sn in chosen:
-            payload = {
-                "name": sn,
-                "topicId": subtopic_ids.get(sub_name) or parent_id_map.get(sub_name, None),
-                "difficulty": random.choice(DIFFICULTY)
-            }
-            if not payload["topicId"]:
+        # 3) Create skills per subtopic (2–4 each)
+        skills = []
+        for sub_name, skill_names in SKILLS_TEMPLATES.items():
+            k = random.randint(2, min(4, len(skill_names)))
+            chosen = random.sample(skill_names, k)
+            topic_id = ids.get(f"topic:{sub_name}")
+            if not topic_id:
                 continue
-            s = post_json(f"{TOPICS_API_BASE}/skills", payload)
-            total_skills += 1
-            print(f"    Created skill: {sn} (topic: {sub_name})")
-            time.sleep(0.02)  # tiny delay to be kind
+            for sn in chosen:
+                skills.append((f"skill:{sub_name}:{sn}", {
+                    "name": sn,
+                    "topicId": topic_id,
+                    "difficulty": random.choice(DIFFICULTY)
+                }))
+
+        async with Seeder(f"{TOPICS_API_BASE}/skills", progress, bulk_url(SEED_SKILLS_BULK_ENDPOINT)) as seeder:
+            ids = await seeder.seed(skills)
 
-    print(f"Total skills created: {total_skills}")
+        print(f"Total skills created: {sum(1 for key in ids if key.startswith('skill:'))}")
+    finally:
+        progress.close()
 
 if __name__ == "__main__":
-    seed()
+    # fixed seed so a resumed run picks the same skills
+    random.seed(42)
+    asyncio.run(seed())
@@ -0,0 +1,193 @@
+"""
+Concurrent seeding shared by the seed scripts.
+
+Items are POSTed by a bounded pool of workers over one keep-alive
+httpx.AsyncClient, optionally capped to a request rate. Transient failures
+(connection errors, 429, 5xx) are retried with backoff. Every created item is
+appended to a progress file, so an interrupted run picks up where it stopped.
+With a bulk endpoint configured, items go out in batches; the single-item
+endpoint is used instead if the upstream answers 404/405.
+
+Env:
+  SEED_CONCURRENCY      default: 16     parallel requests
+  SEED_RATE_LIMIT       default: 0      max requests/sec, 0 = unlimited
+  SEED_RETRIES          default: 3      retries per request on transient errors
+  SEED_BULK_SIZE        default: 500    items per bulk request
+"""
+
+import os
+import json
+import time
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+SEED_CONCURRENCY = int(os.getenv("SEED_CONCURRENCY", "16"))
+SEED_RATE_LIMIT = float(os.getenv("SEED_RATE_LIMIT", "0"))
+SEED_RETRIES = int(os.getenv("SEED_RETRIES", "3"))
+SEED_BULK_SIZE = int(os.getenv("SEED_BULK_SIZE", "500"))
+
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self.lock:
+            delay = self.next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_at = max(self.next_at, time.monotonic()) + self.interval
+
+
+class Progress:
+    """Created items as JSON lines of {"key": ..., "id": ...}."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Dict[str, Any] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.done[entry["key"]] = entry.get("id")
+        self.fh = open(path, "a", encoding="utf-8") if path else None
+
+    def record(self, key: str, item_id: Any) -> None:
+        self.done[key] = item_id
+        if self.fh:
+            self.fh.write(json.dumps({"key": key, "id": item_id}) + "\n")
+            self.fh.flush()
+
+    def close(self) -> None:
+        if self.fh:
+            self.fh.close()
+
+
+def created_id(data: Any) -> Any:
+    if isinstance(data, dict):
+        return data.get("id") or data.get("_id")
+    return None
+
+
+class Seeder:
+    def __init__(
+        self,
+        endpoint: str,
+        progress: Progress,
+        bulk_endpoint: Optional[str] = None,
+        concurrency: int = SEED_CONCURRENCY,
+        rate: float = SEED_RATE_LIMIT,
+        retries: int = SEED_RETRIES,
+        bulk_size: int = SEED_BULK_SIZE):
+
+        self.endpoint = endpoint
+        self.bulk_endpoint = bulk_endpoint
+        self.progress = progress
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.bulk_size = max(1, bulk_size)
+        self.failed = 0
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "Seeder":
+        self.client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency))
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.client.aclose()
+
+    async def _post(self, url: str, payload: Any) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait()
+            try:
+                response = await self.client.post(url, json=payload)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in TRANSIENT_STATUSES or attempt == self.retries:
+                    return response
+            await asyncio.sleep(0.5 * (2 ** attempt))
+        raise AssertionError("unreachable")
+
+    async def _single(self, key: str, payload: Dict[str, Any]) -> None:
+        try:
+            response = await self._post(self.endpoint, payload)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.failed += 1
+            print(f"failed {key}: {e}")
+            return
+        self.progress.record(key, created_id(response.json()))
+
+    async def _bulk(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        try:
+            response = await self._post(self.bulk_endpoint, [payload for _, payload in batch])
+        except httpx.HTTPError as e:
+            self.failed += len(batch)
+            print(f"failed bulk of {len(batch)}: {e}")
+            return
+
+        if response.status_code in (404, 405):
+            # no bulk route upstream; fall back to one request per item
+            self.bulk_endpoint = None
+            for key, payload in batch:
+                await self._single(key, payload)
+            return
+        if response.is_error:
+            self.failed += len(batch)
+            print(f"failed bulk of {len(batch)}: HTTP {response.status_code}")
+            return
+
+        data = response.json()
+        created = data.get("data", data.get("items", [])) if isinstance(data, dict) else data
+        created = created if isinstance(created, list) else []
+        for idx, (key, _) in enumerate(batch):
+            self.progress.record(key, created_id(created[idx]) if idx < len(created) else None)
+
+    async def seed(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """POSTs every (key, payload) not yet in the progress file; returns key -> created id."""
+        items = list(items)
+        pending = [(key, payload) for key, payload in items if key not in self.progress.done]
+        if self.bulk_endpoint:
+            units = [pending[i:i + self.bulk_size] for i in range(0, len(pending), self.bulk_size)]
+        else:
+            units = [[item] for item in pending]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for unit in units:
+            queue.put_nowait(unit)
+
+        async def worker():
+            while not queue.empty():
+                unit = queue.get_nowait()
+                if self.bulk_endpoint:
+                    await self._bulk(unit)
+                else:
+                    for key, payload in unit:
+                        await self._single(key, payload)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        created = len(pending) - self.failed
+        rate = created / elapsed if elapsed else 0.0
+        print(f"{self.endpoint}: {created} created, {self.failed} failed, "
+              f"{len(items) - len(pending)} already seeded, {rate:.1f} items/sec")
+        self.failed = 0
+        return self.progress.done
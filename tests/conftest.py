@@ -1,8 +1,138 @@
+import asyncio
+import operator
 import pytest
 from app.main import app
 from fastapi.testclient import TestClient
 
 
+_OPERATORS = {"$lt": operator.lt, "$lte": operator.le, "$gt": operator.gt, "$gte": operator.ge}
+
+
+def _matches(doc, query):
+    for key, expected in query.items():
+        if key == "$or":
+            if not any(_matches(doc, branch) for branch in expected):
+                return False
+        elif isinstance(expected, dict) and expected and all(op in _OPERATORS for op in expected):
+            value = doc.get(key)
+            if value is None or not all(_OPERATORS[op](value, bound) for op, bound in expected.items()):
+                return False
+        elif doc.get(key) != expected:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if included:
+        projected = {key: doc[key] for key in included if key in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    return {key: value for key, value in doc.items() if key not in projection}
+
+
+class UpdateResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+
+
+class FakeCursor:
+    """The parts of pymongo's async cursor the app uses."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.batch = None
+
+    def sort(self, keys):
+        for key, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def batch_size(self, count):
+        self.batch = count
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakePaths:
+    """In-memory learning_paths collection, keyed by pathId.
+
+    Filters support plain equality on top-level fields, $lt/$lte/$gt/$gte and
+    $or; projections only include or exclude top-level fields. Every call is
+    recorded in `calls`. Array filters are not emulated, so
+    find_one_and_update just returns `result`.
+    """
+
+    def __init__(self, result=None):
+        self.docs = {}
+        self.calls = []
+        self.result = result
+
+    def _store(self, doc):
+        # the driver sets _id on the inserted document
+        doc.setdefault("_id", f"oid-{len(self.docs)}")
+        self.docs[doc["pathId"]] = dict(doc)
+
+    async def insert_one(self, doc):
+        self.calls.append(("insert_one", doc))
+        # a real insert waits on the server, let other tasks run meanwhile
+        await asyncio.sleep(0)
+        self._store(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(("insert_many", docs))
+        for doc in docs:
+            self._store(doc)
+
+    def _update(self, query, update, limit=None):
+        matched = [doc for doc in self.docs.values() if _matches(doc, query)][:limit]
+        for doc in matched:
+            doc.update(update.get("$set", {}))
+        return UpdateResult(len(matched))
+
+    async def update_one(self, query, update, **kwargs):
+        self.calls.append(("update_one", query, update))
+        return self._update(query, update, limit=1)
+
+    async def update_many(self, query, update, **kwargs):
+        self.calls.append(("update_many", query, update))
+        return self._update(query, update)
+
+    def find(self, query=None, projection=None):
+        self.calls.append(("find", query, projection))
+        return FakeCursor([_project(doc, projection) for doc in self.docs.values() if _matches(doc, query or {})])
+
+    async def find_one(self, query, projection=None):
+        self.calls.append(("find_one", query, projection))
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.calls.append(("find_one_and_update", query, update, kwargs))
+        return self.result
+
+
+@pytest.fixture
+def fake_paths():
+    return FakePaths()
+
+
 @pytest.fixture
 def client(monkeypatch):
 
@@ -0,0 +1,69 @@
+import asyncio
+import httpx
+from openai import RateLimitError
+from app import batch
+from app.generation import PlanError
+from app.models import GenerateRequest
+
+
+def _rate_limited():
+    response = httpx.Response(429, headers={"retry-after": "0"}, request=httpx.Request("POST", "http://llm"))
+    return RateLimitError("slow down", response=response, body=None)
+
+
+def test_batch_plans_each_goal_set_once_and_inserts_once(monkeypatch, fake_paths):
+    calls = []
+
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        calls.append(tuple(desired_skills))
+        if desired_skills == ["Broken"]:
+            raise PlanError("bad output")
+        return {"summary": "s", "milestones": [{"type": "skill", "label": desired_skills[0]}]}
+
+    monkeypatch.setattr(batch, "paths", fake_paths)
+    monkeypatch.setattr(batch, "plan_for", mock_plan_for)
+
+    items = [
+        GenerateRequest(userId="a", desiredSkills=["React"]),
+        GenerateRequest(userId="b", desiredSkills=["react"]),
+        GenerateRequest(userId="c", desiredSkills=["Broken"], planner="llm"),
+    ]
+    results = asyncio.run(batch.generate_batch(items))
+
+    assert sorted(calls) == [("Broken",), ("React",)]
+    assert [call[0] for call in fake_paths.calls] == ["insert_many"]
+    assert len(fake_paths.calls[0][1]) == 2
+    assert [result["ok"] for result in results] == [True, True, False]
+    assert results[0]["pathId"] != results[1]["pathId"]
+    assert results[2]["error"] == "OpenAI error: bad output"
+
+
+def test_batch_retries_rate_limited_plans(monkeypatch, fake_paths):
+    attempts = []
+
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise PlanError("rate limited") from _rate_limited()
+        return {"summary": "s", "milestones": []}
+
+    monkeypatch.setattr(batch, "paths", fake_paths)
+    monkeypatch.setattr(batch, "plan_for", mock_plan_for)
+
+    results = asyncio.run(batch.generate_batch([GenerateRequest(desiredSkills=["React"])]))
+
+    assert len(attempts) == 2
+    assert results[0]["ok"] is True
+
+
+def test_batch_falls_back_to_local_planner_in_auto_mode(monkeypatch, fake_paths):
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        raise PlanError("outage")
+
+    monkeypatch.setattr(batch, "paths", fake_paths)
+    monkeypatch.setattr(batch, "plan_for", mock_plan_for)
+    monkeypatch.setattr(batch, "plan_locally", lambda skills, topics, index: {"summary": "local", "milestones": [], "planner": "local"})
+
+    results = asyncio.run(batch.generate_batch([GenerateRequest(desiredSkills=["React"])]))
+
+    assert results[0]["ok"] is True
@@ -0,0 +1,114 @@
+import time
+import asyncio
+from app import catalog_index
+from app.catalog_index import CatalogIndex
+
+
+TOPICS = [
+    {"id": "t-web", "name": "Web Development Fundamentals"},
+    {"id": "t-css", "name": "CSS Basics", "parentId": "t-web"},
+    {"id": "t-html", "name": "HTML & Semantic Structure", "parentId": "t-web"},
+]
+
+SKILLS = [
+    {"id": "s-flex", "skill": "Flexbox", "topicID": "t-css"},
+    {"id": "s-forms", "skill": "Forms & Validation", "topicID": "t-html"},
+]
+
+
+def test_index_builds_topic_tree_and_skill_links():
+    index = CatalogIndex().update(topics=TOPICS, skills=SKILLS, resources=[])
+
+    assert index.subtopics("t-web") == ["t-css", "t-html"]
+    assert index.parent_of("t-css") == "t-web"
+    assert index.skill_topic["s-flex"] == "t-css"
+    assert index.skills_by_topic["t-html"] == ["s-forms"]
+
+
+def test_index_match_counts_term_hits():
+    resources = [
+        {"id": "r-1", "title": "CSS: Flexbox — Course"},
+        {"id": "r-2", "title": "CSS: Grid Layout — Video"},
+    ]
+    index = CatalogIndex().update(resources=resources)
+
+    assert index.match(index.resource_title_postings, {"css", "flexbox"}) == {"r-1": 2, "r-2": 1}
+
+
+def test_index_update_only_rebuilds_changed_catalog():
+    index = CatalogIndex().update(topics=TOPICS, skills=SKILLS, resources=[])
+    topic_postings = index.topic_postings
+
+    new_skills = SKILLS + [{"id": "s-grid", "skill": "Grid Layout", "topicID": "t-css"}]
+    index.update(topics=TOPICS, skills=new_skills, resources=[])
+
+    assert index.topic_postings is topic_postings
+    assert index.skills_by_topic["t-css"] == ["s-flex", "s-grid"]
+
+
+def test_refresh_swaps_in_changed_catalogs_and_applies_drained_patches():
+    index = CatalogIndex()
+    resources = [{"id": "r-1", "title": "CSS Flexbox"}]
+    catalog = {"topics": TOPICS, "skills": SKILLS, "resources": resources}
+
+    async def run():
+        await index.refresh(catalog)
+        topic_postings = index.topic_postings
+        resources.append({"id": "r-2", "title": "CSS Grid"})
+        await index.refresh(catalog, lambda: {"resources": [resources[-1]]})
+        return topic_postings
+
+    topic_postings = asyncio.run(run())
+
+    assert index.topic_postings is topic_postings
+    assert index.resources is resources
+    assert index.versions == CatalogIndex().update(**catalog).versions
+    assert index.match(index.resource_title_postings, {"css"}) == {"r-1": 1, "r-2": 1}
+
+
+def test_index_lookup_is_fast_on_large_catalog():
+    resources = [
+        {"id": f"r-{i}", "title": f"Theme {i % 500}: Tag {i % 37} — Course", "description": ""}
+        for i in range(100_000)
+    ]
+    index = CatalogIndex().update(resources=resources)
+
+    started = time.perf_counter()
+    hits = index.match(index.resource_title_postings, {"499"})
+    elapsed = time.perf_counter() - started
+
+    assert len(hits) == 200
+    assert elapsed < 0.01
+
+
+def test_postings_keep_the_best_ranked_ids_per_term(monkeypatch):
+    monkeypatch.setattr(catalog_index, "POSTINGS_PER_TERM", 2)
+    resources = [
+        {"id": "r-1", "title": "Python Packaging Deep Dive"},
+        {"id": "r-2", "title": "Python"},
+        {"id": "r-3", "title": "Python Typing"},
+    ]
+    index = CatalogIndex().update(resources=resources)
+
+    assert index.resource_title_postings["python"] == ["r-2", "r-3"]
+    assert index.resource_title_postings["packaging"] == ["r-1"]
+
+
+def test_patch_matches_full_rebuild():
+    resources = [{"id": "r-1", "title": "CSS Flexbox"}, {"id": "r-2", "title": "CSS Grid"}]
+    index = CatalogIndex().update(topics=TOPICS, skills=SKILLS, resources=resources)
+
+    index.patch("resources", [{"id": "r-2", "title": "Grid Layout"}, {"id": "r-1", "deleted": True}, {"id": "r-3", "title": "Box Model"}])
+    index.patch("skills", [{"id": "s-flex", "skill": "Flexbox", "topicID": "t-html"}])
+    index.patch("topics", [{"id": "t-css", "deleted": True}])
+
+    expected = CatalogIndex().update(
+        topics=[TOPICS[0], TOPICS[2]],
+        skills=[{"id": "s-flex", "skill": "Flexbox", "topicID": "t-html"}, SKILLS[1]],
+        resources=[{"id": "r-2", "title": "Grid Layout"}, {"id": "r-3", "title": "Box Model"}])
+
+    assert index.versions == expected.versions
+    assert index.resource_title_postings == expected.resource_title_postings
+    assert index.subtopics("t-web") == ["t-html"]
+    assert sorted(index.skills_by_topic["t-html"]) == ["s-flex", "s-forms"]
+    assert index.skills_by_topic.get("t-css") == []
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from app import clients
 from app.clients import fetch_topics, fetch_skills, fetch_resources
@@ -12,13 +13,13 @@ class _Capture:
 def test_fetch_topics_calls_expected_url(monkeypatch):
     cap = _Capture()
 
-    def mock_get_json(url):
+    async def mock_get_json(url):
         cap.calls.append(url)
         return [{"id": "t1", "name": "Topic 1"}]
     
     monkeypatch.setattr(clients, "get_json", mock_get_json)
 
-    result = fetch_topics()
+    result = asyncio.run(fetch_topics())
     expected_url = f"{TOPICS_API_BASE_URL}/topics"
 
     assert cap.calls == [expected_url]
@@ -28,13 +29,13 @@ def test_fetch_topics_calls_expected_url(monkeypatch):
 def test_fetch_skills_calls_expected_url(monkeypatch):
     cap = _Capture()
 
-    def mock_get_json(url):
+    async def mock_get_json(url):
         cap.calls.append(url)
         return [{"id": "s1", "name": "Skill 1"}]
     
     monkeypatch.setattr(clients, "get_json", mock_get_json)
 
-    result = fetch_skills()
+    result = asyncio.run(fetch_skills())
     expected_url = f"{TOPICS_API_BASE_URL}/skills"
 
     assert cap.calls == [expected_url]
@@ -44,14 +45,174 @@ def test_fetch_skills_calls_expected_url(monkeypatch):
 def test_fetch_resources_calls_expected_url(monkeypatch):
     cap = _Capture()
 
-    def mock_get_json(url):
+    async def mock_get_json(url):
         cap.calls.append(url)
         return [{"id": "r1", "title": "Resource 1"}]
     
     monkeypatch.setattr(clients, "get_json", mock_get_json)
 
-    result = fetch_resources()
+    result = asyncio.run(fetch_resources())
     expected_url = f"{RESOURCES_API_BASE_URL}/resources"
 
     assert cap.calls == [expected_url]
     assert result == [{"id": "r1", "title": "Resource 1"}]
+
+
+def test_catalog_cache_serves_fresh_entry_without_reload():
+    cache = clients.CatalogCache(ttl=60, stale_ttl=120, max_entries=4)
+    cap = _Capture()
+
+    async def loader():
+        cap.calls.append("load")
+        return [{"id": "t1"}]
+
+    async def run():
+        first = await cache.get("topics", loader)
+        second = await cache.get("topics", loader)
+        return first, second
+
+    assert asyncio.run(run()) == ([{"id": "t1"}], [{"id": "t1"}])
+    assert cap.calls == ["load"]
+
+
+def test_catalog_cache_evicts_least_recently_used():
+    cache = clients.CatalogCache(ttl=60, stale_ttl=120, max_entries=2)
+
+    def value(v):
+        async def loader():
+            return v
+        return loader
+
+    async def run():
+        await cache.get("a", value(1))
+        await cache.get("b", value(2))
+        await cache.get("a", value(1))
+        await cache.get("c", value(3))
+        assert len(cache) == 2
+        return await cache.get("b", value("reloaded"))
+
+    assert asyncio.run(run()) == "reloaded"
+
+
+def test_catalog_cache_invalidate_forces_reload():
+    cache = clients.CatalogCache(ttl=60, stale_ttl=120, max_entries=4)
+
+    async def old():
+        return "old"
+
+    async def new():
+        return "new"
+
+    async def run():
+        await cache.get("topics", old)
+        cache.invalidate("topics")
+        return await cache.get("topics", new)
+
+    assert asyncio.run(run()) == "new"
+
+
+def test_catalog_cache_keeps_cached_object_when_reload_is_unchanged():
+    cache = clients.CatalogCache(ttl=0, stale_ttl=0, max_entries=4)
+
+    def value(items):
+        async def loader():
+            return [dict(item) for item in items]
+        return loader
+
+    async def run():
+        first = await cache.get("topics", value([{"id": "t1"}]))
+        same = await cache.get("topics", value([{"id": "t1"}]))
+        changed = await cache.get("topics", value([{"id": "t2"}]))
+        return first, same, changed
+
+    first, same, changed = asyncio.run(run())
+
+    assert same is first
+    assert changed == [{"id": "t2"}]
+
+
+def test_fetch_catalog_runs_fetches_concurrently(monkeypatch):
+    import time
+
+    def slow(value):
+        async def getter():
+            await asyncio.sleep(0.2)
+            return value
+        return getter
+
+    monkeypatch.setattr(clients, "get_topics", slow(["t"]))
+    monkeypatch.setattr(clients, "get_skills", slow(["s"]))
+    monkeypatch.setattr(clients, "get_resources", slow(["r"]))
+
+    started = time.monotonic()
+    catalog = asyncio.run(clients.fetch_catalog(deadline=2))
+
+    assert catalog == {"topics": ["t"], "skills": ["s"], "resources": ["r"]}
+    assert time.monotonic() - started < 0.5
+
+
+def test_fetch_catalog_names_failing_upstream(monkeypatch):
+    async def empty():
+        return []
+
+    async def broken():
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(clients, "get_topics", empty)
+    monkeypatch.setattr(clients, "get_skills", broken)
+    monkeypatch.setattr(clients, "get_resources", empty)
+
+    with pytest.raises(clients.UpstreamError) as err:
+        asyncio.run(clients.fetch_catalog(deadline=2))
+
+    assert err.value.name == "skills"
+
+
+def test_fetch_catalog_applies_per_call_deadline(monkeypatch):
+    async def empty():
+        return []
+
+    async def hanging():
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(clients, "get_topics", empty)
+    monkeypatch.setattr(clients, "get_skills", empty)
+    monkeypatch.setattr(clients, "get_resources", hanging)
+
+    with pytest.raises(clients.UpstreamError) as err:
+        asyncio.run(clients.fetch_catalog(deadline=0.05))
+
+    assert err.value.name == "resources"
+
+
+def test_catalog_sync_patches_deltas_in_place(monkeypatch):
+    responses = [
+        ([{"_id": "r-1", "title": "A", "updatedAt": "2025-01-01"}, {"_id": "r-2", "title": "B", "updatedAt": "2025-01-02"}], "v1"),
+        ([{"_id": "r-2", "title": "B2", "updatedAt": "2025-01-03"}, {"_id": "r-1", "deleted": True, "updatedAt": "2025-01-03"},
+          {"_id": "r-3", "title": "C", "updatedAt": "2025-01-03"}], "v2"),
+        (None, "v2"),
+    ]
+    calls = []
+
+    async def mock_get(url, etag=None, params=None, timeout=None):
+        calls.append((etag, params))
+        return responses[len(calls) - 1]
+
+    monkeypatch.setattr(clients, "get_json_conditional", mock_get)
+    sync = clients.CatalogSync("http://x/resources", mode="delta", normalize=clients._resource_id)
+
+    async def run():
+        first = await sync.refresh()
+        second = await sync.refresh()
+        third = await sync.refresh()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert first is second is third
+    assert sorted(item["id"] for item in first) == ["r-2", "r-3"]
+    assert {item["id"]: item["title"] for item in first}["r-2"] == "B2"
+    assert calls[1] == (None, {"updatedSince": "2025-01-02"})
+    assert calls[2] == (None, {"updatedSince": "2025-01-03"})
+    assert [item["id"] for item in sync.drain()] == ["r-2", "r-1", "r-3"]
+    assert sync.drain() == []
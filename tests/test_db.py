@@ -0,0 +1,19 @@
+from app.db import plan_stages
+
+
+def test_plan_stages_walks_nested_stages():
+    plan = {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "userId_1_createdAt_-1"}
+    }
+
+    assert plan_stages(plan) == {"FETCH", "IXSCAN"}
+
+
+def test_plan_stages_finds_collscan_under_sort():
+    plan = {
+        "stage": "SORT",
+        "inputStage": {"stage": "OR", "inputStages": [{"stage": "COLLSCAN"}, {"stage": "IXSCAN"}]}
+    }
+
+    assert "COLLSCAN" in plan_stages(plan)
@@ -0,0 +1,58 @@
+import json
+import asyncio
+from datetime import datetime
+from fastapi.testclient import TestClient
+from app import main
+
+
+def _path(idx):
+    return {
+        "pathId": f"lp-{idx}",
+        "userId": "u1",
+        "goals": {"skills": ["React"], "topics": []},
+        "milestones": [{"milestoneId": "m1", "status": "done"}],
+        "createdAt": datetime(2025, 1, idx),
+        "schemaVersion": 2
+    }
+
+
+def test_export_streams_ndjson_in_batches(monkeypatch, fake_paths):
+    for idx in (1, 2, 3):
+        fake_paths.docs[f"lp-{idx}"] = {"_id": f"oid-{idx}", **_path(idx)}
+    monkeypatch.setattr(main, "paths", fake_paths)
+    monkeypatch.setattr(main, "EXPORT_BATCH_SIZE", 2)
+
+    async def run():
+        # called directly, the test client would join the chunks
+        response = await main.export_paths(userId=None, createdFrom=None, createdTo=None, milestoneStatus=None)
+        return response, [chunk async for chunk in response.body_iterator]
+
+    response, chunks = asyncio.run(run())
+
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert response.media_type == "application/x-ndjson"
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 1]
+    assert [json.loads(line)["pathId"] for line in lines] == ["lp-3", "lp-2", "lp-1"]
+    assert json.loads(lines[0])["createdAt"].startswith("2025-01-03T00:00:00")
+    assert "_id" not in json.loads(lines[0]) and "schemaVersion" not in json.loads(lines[0])
+
+
+def test_export_builds_filter_from_query(monkeypatch, fake_paths):
+    monkeypatch.setattr(main, "paths", fake_paths)
+
+    response = TestClient(main.app).get("/paths/export", params={
+        "userId": "u1",
+        "createdFrom": "2025-01-01T00:00:00",
+        "createdTo": "2025-02-01T00:00:00",
+        "milestoneStatus": "done"
+    })
+
+    _, query, projection = fake_paths.calls[0]
+    assert response.status_code == 200
+    assert response.text == ""
+    assert query == {
+        "userId": "u1",
+        "createdAt": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 2, 1)},
+        "milestones.status": "done"
+    }
+    assert projection == {"_id": 0, "schemaVersion": 0}
@@ -0,0 +1,55 @@
+import asyncio
+from app import generation
+from app.models import GenerateRequest
+
+
+def test_identical_concurrent_requests_share_plan_but_not_path(monkeypatch):
+    calls = []
+
+    async def mock_ask(desired_skills, desired_topics, topics, skills, resources):
+        calls.append(desired_skills)
+        await asyncio.sleep(0.05)
+        return {"summary": "s", "milestones": [{"type": "skill", "label": "React"}]}
+
+    async def no_cached_plan(key):
+        return None
+
+    async def no_store(key, plan):
+        pass
+
+    monkeypatch.setattr(generation, "ask_openai_for_plan", mock_ask)
+    monkeypatch.setattr(generation, "get_cached_plan", no_cached_plan)
+    monkeypatch.setattr(generation, "store_plan", no_store)
+
+    body = GenerateRequest(userId="u1", desiredSkills=["React"])
+
+    async def run():
+        plans = await asyncio.gather(*(generation.plan_for(body.desiredSkills, body.desiredTopics) for _ in range(3)))
+        return [generation.build_path_doc(body, plan) for plan in plans]
+
+    docs = asyncio.run(run())
+
+    assert calls == [["React"]]
+    assert len({doc["pathId"] for doc in docs}) == 3
+    assert docs[0]["milestones"][0]["milestoneId"] == "m1"
+
+
+def test_auto_planner_falls_back_to_local_plan_on_llm_error(monkeypatch):
+    async def failing_ask(*args):
+        raise RuntimeError("boom")
+
+    async def no_cached_plan(key):
+        return None
+
+    monkeypatch.setattr(generation, "ask_openai_for_plan", failing_ask)
+    monkeypatch.setattr(generation, "get_cached_plan", no_cached_plan)
+
+    plan = asyncio.run(generation.plan_for(["React"], [], "auto"))
+    assert plan["planner"] == "local"
+
+    try:
+        asyncio.run(generation.plan_for(["React"], [], "llm"))
+    except generation.PlanError:
+        pass
+    else:
+        raise AssertionError("llm planner must not fall back")
@@ -2,6 +2,7 @@ import re
 from datetime import datetime
 import types
 import builtins
+import asyncio
 import pytest
 from app import helpers
 
@@ -35,22 +36,65 @@ class _MockResponse:
             raise Exception("HTTP error")
     
 
+class _MockSession:
+    def __init__(self, payload):
+        self._payload = payload
+        self.calls = []
+    async def get(self, url, **kwargs):
+        self.calls.append(url)
+        return _MockResponse(self._payload)
+
+
 def test_get_json_returns_plain_payload(monkeypatch):
-    def mock_get(url, timeout=10):
-        return _MockResponse([{"id": "a"}, {"id": "b"}])
-    
-    monkeypatch.setattr(helpers.requests, "get", mock_get)
+    session = _MockSession([{"id": "a"}, {"id": "b"}])
+    monkeypatch.setattr(helpers, "get_client", lambda url: session)
 
-    response = helpers.get_json("http://example/api")
+    response = asyncio.run(helpers.get_json("http://example/api"))
     assert response == [{"id": "a"}, {"id": "b"}]
 
 
 def test_get_json_unwrap_data_array(monkeypatch):
-    def mock_get(url, timeout=10):
-        return _MockResponse({"data": [{"id": "a"}, {"id": "b"}]})
-    
-    monkeypatch.setattr(helpers.requests, "get", mock_get)
+    session = _MockSession({"data": [{"id": "a"}, {"id": "b"}]})
+    monkeypatch.setattr(helpers, "get_client", lambda url: session)
 
-    response = helpers.get_json("http://example/api")
+    response = asyncio.run(helpers.get_json("http://example/api"))
     assert response == [{"id": "a"}, {"id": "b"}]
 
+
+
+def test_get_json_retries_gateway_errors(monkeypatch):
+    responses = [_MockResponse({}, 503), _MockResponse([{"id": "a"}])]
+
+    class _FlakySession:
+        async def get(self, url, **kwargs):
+            return responses.pop(0)
+
+    monkeypatch.setattr(helpers, "get_client", lambda url: _FlakySession())
+    monkeypatch.setattr(helpers, "HTTP_RETRY_BACKOFF", 0)
+
+    response = asyncio.run(helpers.get_json("http://example/api"))
+    assert response == [{"id": "a"}]
+
+
+def test_get_client_is_shared_per_base_url():
+    async def run():
+        try:
+            first = helpers.get_client("http://example:5000/topics")
+            second = helpers.get_client("http://example:5000/skills")
+            other = helpers.get_client("http://other:5002/resources")
+
+            assert first is second
+            assert first is not other
+        finally:
+            await helpers.close_clients()
+
+    asyncio.run(run())
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123000)
+
+    cursor = helpers.encode_cursor(created_at, "lp-123")
+
+    assert "=" not in cursor
+    assert helpers.decode_cursor(cursor) == (created_at, "lp-123")
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from app import jobs
+from app.models import GenerateRequest
+
+
+@pytest.fixture
+def job_paths(monkeypatch, fake_paths):
+    monkeypatch.setattr(jobs, "paths", fake_paths)
+
+    async def mock_load_catalog():
+        return {}
+
+    monkeypatch.setattr(jobs, "load_catalog", mock_load_catalog)
+    return fake_paths
+
+
+def test_job_runs_to_done(monkeypatch, job_paths):
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        return {"summary": "plan", "milestones": [{"type": "skill", "label": "React"}]}
+
+    monkeypatch.setattr(jobs, "plan_for", mock_plan_for)
+    runner = jobs.JobRunner(concurrency=1, depth=4)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        runner._workers = [asyncio.create_task(runner._work())]
+        job = await runner.submit(GenerateRequest(desiredSkills=["React"]))
+        assert job["status"] == "queued"
+        await runner._queue.join()
+        await runner.stop()
+        return job["pathId"]
+
+    path_id = asyncio.run(run())
+    doc = job_paths.docs[path_id]
+
+    assert doc["status"] == "done"
+    assert doc["milestones"][0]["milestoneId"] == "m1"
+
+
+def test_job_failure_is_recorded(monkeypatch, job_paths):
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        raise jobs.PlanError("timeout")
+
+    monkeypatch.setattr(jobs, "plan_for", mock_plan_for)
+    runner = jobs.JobRunner(concurrency=1, depth=4)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        runner._workers = [asyncio.create_task(runner._work())]
+        job = await runner.submit(GenerateRequest(desiredSkills=["React"]))
+        await runner._queue.join()
+        await runner.stop()
+        return job["pathId"]
+
+    doc = job_paths.docs[asyncio.run(run())]
+
+    assert doc["status"] == "failed"
+    assert doc["error"] == "OpenAI error: timeout"
+
+
+def test_submit_rejects_when_queue_is_full(job_paths):
+    runner = jobs.JobRunner(concurrency=1, depth=1)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        await runner.submit(GenerateRequest(desiredSkills=["React"]))
+        with pytest.raises(jobs.QueueFull):
+            await runner.submit(GenerateRequest(desiredSkills=["Testing"]))
+
+    asyncio.run(run())
+
+
+def test_concurrent_submits_reject_once_the_queue_is_full(job_paths):
+    runner = jobs.JobRunner(concurrency=1, depth=2)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        return await asyncio.gather(
+            *(runner.submit(GenerateRequest(desiredSkills=[f"Skill {idx}"])) for idx in range(4)),
+            return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert sum(isinstance(result, jobs.QueueFull) for result in results) == 2
+    assert all(isinstance(result, (dict, jobs.QueueFull)) for result in results)
+    assert len(job_paths.docs) == runner._queue.qsize() == 2
+
+
+def test_stopping_mid_job_hands_it_back_as_queued(monkeypatch, job_paths):
+    started = asyncio.Event()
+
+    async def slow_plan_for(desired_skills, desired_topics, planner="auto"):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs, "plan_for", slow_plan_for)
+    runner = jobs.JobRunner(concurrency=1, depth=4)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        runner._workers = [asyncio.create_task(runner._work())]
+        job = await runner.submit(GenerateRequest(desiredSkills=["React"]))
+        await started.wait()
+        await runner.stop()
+        return job["pathId"]
+
+    assert job_paths.docs[asyncio.run(run())]["status"] == "queued"
+
+
+def test_requeue_picks_up_running_jobs_past_their_lease(job_paths):
+    now = datetime.now()
+    for path_id, status, updated_at in (
+        ("lp-stale", "running", now - timedelta(seconds=jobs.JOB_LEASE + 60)),
+        ("lp-live", "running", now),
+        ("lp-queued", "queued", now),
+    ):
+        job_paths.docs[path_id] = {"pathId": path_id, "status": status, "goals": {"skills": ["React"]}, "updatedAt": updated_at}
+    runner = jobs.JobRunner(concurrency=1, depth=4)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        await runner._requeue_unfinished()
+        return sorted(runner._queue.get_nowait()[0] for _ in range(runner._queue.qsize()))
+
+    assert asyncio.run(run()) == ["lp-queued", "lp-stale"]
+    assert job_paths.docs["lp-live"]["status"] == "running"
+
+
+def test_requeued_job_keeps_its_planner(job_paths):
+    runner = jobs.JobRunner(concurrency=1, depth=4)
+
+    async def run():
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        job = await runner.submit(GenerateRequest(desiredSkills=["React"], planner="local"))
+        runner._queue = asyncio.Queue(maxsize=runner.depth)
+        await runner._requeue_unfinished()
+        return job["pathId"], runner._queue.get_nowait()
+
+    path_id, (requeued_id, body) = asyncio.run(run())
+
+    assert requeued_id == path_id
+    assert body.planner == "local"
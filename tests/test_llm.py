@@ -0,0 +1,26 @@
+import asyncio
+from types import SimpleNamespace
+from app import llm
+
+
+class FakeCompletions:
+    async def create(self, **kwargs):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"summary": "s", "milestones": []}'))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=200)
+        )
+
+
+def test_plan_call_records_tokens_cost_and_prompt_size(monkeypatch):
+    monkeypatch.setattr(llm, "client", SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions())))
+    monkeypatch.setattr(llm, "OPENAI_MODEL", "test-model")
+    monkeypatch.setitem(llm.OPENAI_PRICES, "test-model", [1.0, 2.0])
+
+    plan = asyncio.run(llm.ask_openai_for_plan(["React"], [], [{"id": "t1", "name": "Web"}], [], []))
+
+    assert plan["summary"] == "s"
+    assert llm.llm_prompt_tokens.get(model="test-model", call="plan") == 1000
+    assert llm.llm_completion_tokens.get(model="test-model", call="plan") == 200
+    assert llm.llm_cost.get(model="test-model") == (1000 * 1.0 + 200 * 2.0) / 1_000_000
+    assert llm.llm_latency.count(model="test-model", call="plan") == 1
+    assert llm.llm_prompt_items.get(catalog="topics") == 1
@@ -0,0 +1,69 @@
+from app.metrics import Counter, Histogram, render
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    requests = Counter("test_requests_total", "Requests", ["route"])
+    latency = Histogram("test_latency_seconds", "Latency", ["route"], buckets=(0.1, 1))
+
+    requests.inc(route="/paths")
+    requests.inc(2, route="/paths")
+    latency.observe(0.05, route="/paths")
+    latency.observe(0.5, route="/paths")
+
+    text = render()
+
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="/paths"} 3' in text
+    assert 'test_latency_seconds_bucket{route="/paths",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/paths",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{route="/paths"} 2' in text
+
+
+def test_metrics_endpoint_reports_route_latency_and_generation_stages(monkeypatch, fake_paths):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    async def no_catalog():
+        return {}
+
+    async def mock_plan_for(desired_skills, desired_topics, planner="auto"):
+        return {"summary": "s", "milestones": [{"type": "skill", "label": "React"}]}
+
+    async def plan_cache_size():
+        return 7
+
+    monkeypatch.setattr(main, "paths", fake_paths)
+    monkeypatch.setattr(main, "load_catalog", no_catalog)
+    monkeypatch.setattr(main, "plan_for", mock_plan_for)
+    monkeypatch.setattr(main, "plan_cache_size", plan_cache_size)
+
+    client = TestClient(main.app)
+    assert client.post("/generate", json={"desiredSkills": ["React"]}).status_code == 200
+    text = client.get("/metrics").text
+
+    assert 'http_requests_total{method="POST",route="/generate",status="200"}' in text
+    assert 'generation_stage_seconds_count{stage="mongo_insert"}' in text
+    assert 'generation_stage_seconds_count{stage="normalization"}' in text
+    assert "generations_in_flight 0" in text
+    assert 'cache_entries{cache="catalog"}' in text
+    assert 'cache_entries{cache="plan"} 7' in text
+    assert "plan_calls_in_flight 0" in text
+
+
+def test_metrics_do_not_wait_for_an_unreachable_mongo(monkeypatch):
+    import asyncio, time
+    from fastapi.testclient import TestClient
+    from app import main
+
+    async def hanging_plan_cache_size():
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(main, "plan_cache_size", hanging_plan_cache_size)
+    monkeypatch.setattr(main, "METRICS_MONGO_TIMEOUT", 0.05)
+
+    started = time.perf_counter()
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert time.perf_counter() - started < 1
+    assert 'cache_entries{cache="catalog"}' in response.text
@@ -0,0 +1,66 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from pymongo import ReturnDocument
+from app import main
+
+
+def test_bulk_update_sets_each_milestone_through_array_filters(monkeypatch, fake_paths):
+    fake_paths.result = {
+        "pathId": "lp-1",
+        "milestones": [{"milestoneId": "m1", "status": "done"}, {"milestoneId": "m2", "status": "in-progress"}],
+        "updatedAt": datetime(2025, 1, 1)
+    }
+    monkeypatch.setattr(main, "paths", fake_paths)
+
+    response = TestClient(main.app).patch("/paths/lp-1/milestones", json=[
+        {"milestoneId": "m1", "status": "in-progress"},
+        {"milestoneId": "m2", "status": "in-progress"},
+        {"milestoneId": "m1", "status": "done"},
+        {"milestoneId": "m9", "status": "done"}
+    ])
+
+    _, query, update, kwargs = fake_paths.calls[0]
+    assert response.status_code == 200
+    assert query == {"pathId": "lp-1"}
+    assert update["$set"]["milestones.$[m0].status"] == "done"
+    assert update["$set"]["milestones.$[m1].status"] == "in-progress"
+    assert "updatedAt" in update["$set"]
+    assert kwargs["array_filters"] == [{"m0.milestoneId": "m1"}, {"m1.milestoneId": "m2"}, {"m2.milestoneId": "m9"}]
+    assert response.json()["unknownMilestoneIds"] == ["m9"]
+
+
+def test_single_update_returns_404_for_unknown_milestone(monkeypatch, fake_paths):
+    monkeypatch.setattr(main, "paths", fake_paths)
+
+    response = TestClient(main.app).patch("/paths/lp-1/milestones/m9", json={"status": "done"})
+
+    assert response.status_code == 404
+
+
+def test_single_update_sets_status_through_array_filter(monkeypatch, fake_paths):
+    fake_paths.result = {"milestones": [
+        {"milestoneId": "m2", "type": "skill", "label": "Flexbox", "skillId": "s-flex",
+         "resources": [{"resourceId": "r-1", "why": "Covers Flexbox"}], "status": "done"}
+    ]}
+    monkeypatch.setattr(main, "paths", fake_paths)
+
+    response = TestClient(main.app).patch("/paths/lp-1/milestones/m2", json={"status": "done"})
+
+    method, query, update, kwargs = fake_paths.calls[0]
+    assert response.status_code == 200
+    assert method == "find_one_and_update"
+    assert query == {"pathId": "lp-1", "milestones.milestoneId": "m2"}
+    assert update["$set"]["milestones.$[m].status"] == "done"
+    assert isinstance(update["$set"]["updatedAt"], datetime)
+    assert kwargs["array_filters"] == [{"m.milestoneId": "m2"}]
+    assert kwargs["projection"] == {"_id": 0, "milestones.$": 1}
+    assert kwargs["return_document"] == ReturnDocument.AFTER
+    assert response.json() == {
+        "milestoneId": "m2",
+        "type": "skill",
+        "label": "Flexbox",
+        "skillId": "s-flex",
+        "topicId": None,
+        "resources": [{"resourceId": "r-1", "why": "Covers Flexbox"}],
+        "status": "done"
+    }
@@ -0,0 +1,37 @@
+import asyncio
+from app import plan_cache
+
+
+def test_plan_key_ignores_goal_order_case_and_spacing():
+    first = plan_cache.plan_key(["React", "Testing"], ["Web  Development"], "v1")
+    second = plan_cache.plan_key(["testing", " react "], ["web development"], "v1")
+
+    assert first == second
+
+
+def test_plan_key_changes_with_catalog_version():
+    assert plan_cache.plan_key(["React"], [], "v1") != plan_cache.plan_key(["React"], [], "v2")
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["key"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["key"]] = doc
+
+
+def test_plan_cache_counts_hits_and_misses(monkeypatch):
+    monkeypatch.setattr(plan_cache.db, "plan_cache", _FakeCollection())
+    monkeypatch.setattr(plan_cache, "stats", {"hits": 0, "misses": 0, "errors": 0})
+
+    async def run():
+        assert await plan_cache.get_cached_plan("k") is None
+        await plan_cache.store_plan("k", {"summary": "cached"})
+        return await plan_cache.get_cached_plan("k")
+
+    assert asyncio.run(run()) == {"summary": "cached"}
+    assert plan_cache.plan_cache_stats() == {"hits": 1, "misses": 1, "errors": 0, "hitRate": 0.5}
@@ -0,0 +1,76 @@
+import asyncio
+from app import plan_repair
+from app.catalog_index import CatalogIndex
+from app.plan_repair import repair_milestone, repair_plan
+
+
+TOPICS = [{"id": "t-css", "name": "CSS Basics"}, {"id": "t-js", "name": "JavaScript"}]
+SKILLS = [
+    {"id": "s-flex", "skill": "Flexbox", "topicID": "t-css"},
+    {"id": "s-promises", "skill": "Promises", "topicID": "t-js"},
+]
+RESOURCES = [{"id": "r-1", "title": "Flexbox Course"}]
+CANDIDATES = {"topics": TOPICS, "skills": SKILLS, "resources": RESOURCES}
+
+
+def _index():
+    return CatalogIndex().update(TOPICS, SKILLS, RESOURCES)
+
+
+def test_unknown_ids_are_remapped_by_label_and_resources_filtered():
+    milestone, broken = repair_milestone({
+        "type": "skill",
+        "label": "Flexbox",
+        "skillId": "s-made-up",
+        "resources": [{"resourceId": "r-1", "why": "w"}, {"resourceId": "r-404"}, {"resourceId": "r-1"}],
+        "status": "unknown"
+    }, _index())
+
+    assert not broken
+    assert milestone["skillId"] == "s-flex"
+    assert milestone["topicId"] == "t-css"
+    assert milestone["resources"] == [{"resourceId": "r-1", "why": "w"}]
+    assert milestone["status"] == "pending"
+
+
+def test_missing_type_and_label_are_filled_from_catalog():
+    milestone, broken = repair_milestone({"skillId": "s-promises"}, _index())
+
+    assert not broken
+    assert milestone["type"] == "skill"
+    assert milestone["label"] == "Promises"
+
+
+def test_only_broken_milestones_are_sent_back_to_the_llm(monkeypatch):
+    sent = []
+
+    async def mock_ask_for_milestones(desired_skills, desired_topics, broken, topics, skills, resources):
+        sent.append(broken)
+        return [{"type": "skill", "label": "Promises", "skillId": "s-promises"}]
+
+    monkeypatch.setattr(plan_repair, "ask_openai_for_milestones", mock_ask_for_milestones)
+
+    plan = {"summary": "s", "milestones": [
+        {"milestoneId": "m1", "type": "skill", "label": "Flexbox", "skillId": "s-flex"},
+        {"milestoneId": "m2", "type": "skill", "label": "Quantum Weaving", "skillId": "s-404"},
+        {"milestoneId": "m1", "type": "topic", "label": "JavaScript", "topicId": "t-js"},
+    ]}
+
+    repaired = asyncio.run(repair_plan(plan, ["Flexbox"], [], CANDIDATES, _index()))
+
+    assert len(sent) == 1 and [milestone["label"] for milestone in sent[0]] == ["Quantum Weaving"]
+    assert [milestone["skillId"] for milestone in repaired["milestones"]] == ["s-flex", "s-promises", None]
+    assert [milestone["milestoneId"] for milestone in repaired["milestones"]] == ["m1", "m2", "m3"]
+
+
+def test_milestones_that_stay_broken_are_dropped(monkeypatch):
+    async def failing_ask(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(plan_repair, "ask_openai_for_milestones", failing_ask)
+
+    plan = {"milestones": [{"type": "skill", "label": "Quantum Weaving"}, {"type": "skill", "skillId": "s-flex"}]}
+    repaired = asyncio.run(repair_plan(plan, [], [], CANDIDATES, _index()))
+
+    assert [milestone["label"] for milestone in repaired["milestones"]] == ["Flexbox"]
+    assert repaired["summary"] == ""
@@ -0,0 +1,33 @@
+from app.plan_stream import MilestoneStreamParser
+
+
+PLAN = (
+    '{"summary": "Learn {React} [fast]", "milestones": ['
+    '{"milestoneId": "m1", "type": "skill", "label": "JSX \\"basics\\" }", "resources": [{"resourceId": "r-1"}]},'
+    '{"milestoneId": "m2", "type": "topic", "label": "Testing", "resources": []}'
+    ']}'
+)
+
+
+def test_parser_emits_each_milestone_once_complete():
+    parser = MilestoneStreamParser()
+    emitted = []
+    seen_at = []
+
+    for i in range(0, len(PLAN), 7):
+        found = parser.feed(PLAN[i:i + 7])
+        emitted.extend(found)
+        seen_at.extend([i] * len(found))
+
+    assert [m["milestoneId"] for m in emitted] == ["m1", "m2"]
+    assert emitted[0]["label"] == 'JSX "basics" }'
+    assert seen_at[0] < len(PLAN) - 70
+    assert parser.result()["summary"] == "Learn {React} [fast]"
+
+
+def test_parser_ignores_objects_outside_milestones():
+    parser = MilestoneStreamParser()
+
+    found = parser.feed('{"meta": [{"milestoneId": "x"}], "milestones": [{"milestoneId": "m1"}]}')
+
+    assert found == [{"milestoneId": "m1"}]
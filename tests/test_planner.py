@@ -0,0 +1,71 @@
+import time
+from app.catalog_index import CatalogIndex
+from app.planner import plan_locally
+
+
+TOPICS = [
+    {"id": "t-web", "name": "Web Development Fundamentals"},
+    {"id": "t-css", "name": "CSS Basics", "parentId": "t-web"},
+    {"id": "t-js", "name": "Modern JavaScript (ES6+)", "parentId": "t-web"},
+]
+
+SKILLS = [
+    {"id": "s-grid", "skill": "Grid Layout", "topicID": "t-css", "difficulty": "advanced"},
+    {"id": "s-box", "skill": "Box Model", "topicID": "t-css", "difficulty": "beginner"},
+    {"id": "s-flex", "skill": "Flexbox", "topicID": "t-css", "difficulty": "intermediate"},
+    {"id": "s-promises", "skill": "Promises & Async/Await", "topicID": "t-js", "difficulty": "intermediate"},
+]
+
+RESOURCES = [
+    {"id": "r-1", "title": "CSS: Flexbox — Course"},
+    {"id": "r-2", "title": "CSS: Grid Layout — Video"},
+    {"id": "r-3", "title": "CSS: Box Model — Article"},
+    {"id": "r-4", "title": "JavaScript: Promises — Book"},
+]
+
+
+def _index():
+    return CatalogIndex().update(TOPICS, SKILLS, RESOURCES)
+
+
+def test_local_plan_orders_topic_then_skills_by_difficulty():
+    plan = plan_locally([], ["CSS"], _index())
+
+    assert [milestone["label"] for milestone in plan["milestones"]] == ["CSS Basics", "Box Model", "Flexbox", "Grid Layout"]
+    assert plan["milestones"][0]["type"] == "topic"
+    assert plan["milestones"][1]["skillId"] == "s-box"
+    assert plan["planner"] == "local"
+
+
+def test_local_plan_attaches_distinct_matching_resources():
+    plan = plan_locally(["Flexbox", "Promises"], [], _index())
+    by_label = {milestone["label"]: milestone for milestone in plan["milestones"]}
+
+    assert [ref["resourceId"] for ref in by_label["Flexbox"]["resources"]][0] == "r-1"
+    assert [ref["resourceId"] for ref in by_label["Promises & Async/Await"]["resources"]] == ["r-4"]
+
+
+def test_local_plan_is_deterministic_and_fast():
+    index = _index()
+
+    started = time.perf_counter()
+    first = plan_locally(["Flexbox"], ["CSS Basics"], index)
+    elapsed = time.perf_counter() - started
+
+    assert first == plan_locally(["Flexbox"], ["CSS Basics"], index)
+    assert elapsed < 0.05
+
+
+def test_local_plan_keeps_skills_of_unknown_topics():
+    skills = SKILLS + [{"id": "s-hooks", "skill": "React Hooks", "topicID": "t-missing"}]
+    index = CatalogIndex().update(TOPICS, skills, RESOURCES)
+
+    plan = plan_locally(["React"], [], index)
+
+    assert [(milestone["label"], milestone["topicId"]) for milestone in plan["milestones"]] == [("React Hooks", None)]
+
+
+def test_local_plan_without_matches_is_empty():
+    plan = plan_locally(["Quantum Basket Weaving"], [], _index())
+
+    assert plan["milestones"] == []
@@ -0,0 +1,51 @@
+from app.catalog_index import CatalogIndex
+from app.selection import select_candidates, estimate_tokens, resource_payload
+
+
+TOPICS = [
+    {"id": "t-web", "name": "Web Development Fundamentals"},
+    {"id": "t-css", "name": "CSS Basics", "parentId": "t-web"},
+    {"id": "t-py", "name": "Python Programming"},
+    {"id": "t-fastapi", "name": "Flask & FastAPI Basics", "parentId": "t-py"},
+]
+
+SKILLS = [
+    {"id": "s-flex", "skill": "Flexbox", "topicID": "t-css"},
+    {"id": "s-grid", "skill": "Grid Layout", "topicID": "t-css"},
+    {"id": "s-routing", "skill": "Routing", "topicID": "t-fastapi"},
+]
+
+RESOURCES = [
+    {"id": "r-1", "title": "CSS: Flexbox — Course", "description": "A course covering CSS."},
+    {"id": "r-2", "title": "FastAPI: Routing — Video", "description": "A video covering FastAPI."},
+    {"id": "r-3", "title": "Docker: Volumes — Book", "description": "A book covering Docker."},
+]
+
+
+def test_select_candidates_keeps_only_relevant_items():
+    selected = select_candidates(["Flexbox"], ["CSS Basics"], CatalogIndex().update(TOPICS, SKILLS, RESOURCES), token_budget=10_000)
+
+    assert {topic["id"] for topic in selected["topics"]} == {"t-web", "t-css"}
+    assert {skill["id"] for skill in selected["skills"]} == {"s-flex", "s-grid"}
+    assert [resource["id"] for resource in selected["resources"]] == ["r-1"]
+
+
+def test_select_candidates_follows_skill_topic_links():
+    selected = select_candidates(["Routing"], [], CatalogIndex().update(TOPICS, SKILLS, RESOURCES), token_budget=10_000)
+
+    assert [skill["id"] for skill in selected["skills"]] == ["s-routing"]
+    assert "t-fastapi" in {topic["id"] for topic in selected["topics"]}
+
+
+def test_select_candidates_respects_token_budget():
+    resources = [
+        {"id": f"r-{i}", "title": f"CSS Flexbox part {i}", "description": "x" * 200}
+        for i in range(100)
+    ]
+    budget = 500
+
+    selected = select_candidates(["Flexbox"], [], CatalogIndex().update(TOPICS, SKILLS, resources), token_budget=budget)
+    spent = sum(estimate_tokens(resource_payload(resource)) for resource in selected["resources"])
+
+    assert 0 < len(selected["resources"]) < len(resources)
+    assert spent <= budget
@@ -0,0 +1,45 @@
+import json
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from app import serialization
+from app.models import LearningPath
+
+
+def _doc(**overrides):
+    doc = {
+        "pathId": "lp-1",
+        "userId": "u1",
+        "goals": {"skills": ["React"], "topics": []},
+        "summary": "plan",
+        "milestones": [{
+            "milestoneId": "m1",
+            "type": "skill",
+            "label": "React",
+            "resources": [{"resourceId": "r-1"}]
+        }],
+        "createdAt": datetime(2025, 1, 1, 12, 0, 0, 123000),
+        "updatedAt": datetime(2025, 1, 1, 12, 0, 0, 123000)
+    }
+    doc.update(overrides)
+    return doc
+
+
+def test_canonicalize_stamps_valid_documents():
+    doc = serialization.canonicalize(_doc(), LearningPath)
+
+    assert doc["schemaVersion"] == serialization.SCHEMA_VERSION
+    assert doc["milestones"][0]["resources"] == [{"resourceId": "r-1", "why": None}]
+
+
+def test_canonicalize_leaves_invalid_documents_unstamped():
+    doc = serialization.canonicalize(_doc(milestones=[{"label": "no id"}]), LearningPath)
+
+    assert "schemaVersion" not in doc
+
+
+def test_fast_and_validated_paths_produce_the_same_json():
+    fast = serialization.dump_documents([serialization.canonicalize(_doc(), LearningPath)], LearningPath)
+    slow = serialization.dump_documents([_doc()], LearningPath)
+    reference = jsonable_encoder([LearningPath.model_validate(_doc())])
+
+    assert json.loads(fast) == json.loads(slow) == reference
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append("run")
+        await asyncio.sleep(0.05)
+        return {"summary": "shared"}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert calls == ["run"]
+    assert all(result == {"summary": "shared"} for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    async def broken():
+        calls.append("run")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("rate limited")
+
+    async def run():
+        results = await asyncio.gather(flight.do("k", broken), flight.do("k", broken), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", broken)
+
+    asyncio.run(run())
+    assert calls == ["run", "run"]
@@ -0,0 +1,81 @@
+import asyncio
+from app import snapshot
+from app.catalog_index import CatalogIndex
+from app.clients import CatalogCache
+
+
+CATALOG = {
+    "topics": [{"id": "t-css", "name": "CSS Basics"}],
+    "skills": [{"id": "s-flex", "skill": "Flexbox", "topicID": "t-css"}],
+    "resources": [{"_id": "r-1", "id": "r-1", "title": "CSS: Flexbox — Course"}],
+}
+
+
+def test_snapshot_round_trip_serves_stale_and_revalidates(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT", "file")
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT_PATH", str(tmp_path / "catalog.json.gz"))
+    monkeypatch.setattr(snapshot, "state", {"version": None, "savedAt": None, "restoredVersion": None})
+
+    saved = CatalogIndex().update(**CATALOG)
+    asyncio.run(snapshot.save_snapshot(CATALOG, saved.version))
+
+    index = CatalogIndex()
+    cache = CatalogCache(ttl=60, stale_ttl=600, max_entries=8)
+    monkeypatch.setattr(snapshot, "catalog_index", index)
+    monkeypatch.setattr(snapshot, "catalog_cache", cache)
+
+    reloads = []
+
+    async def loader():
+        reloads.append(True)
+        return [{"id": "t-new", "name": "New"}]
+
+    async def run():
+        assert await snapshot.restore_snapshot()
+        topics = await cache.get(snapshot._cache_keys()["topics"], loader)
+        await asyncio.sleep(0)
+        return topics
+
+    topics = asyncio.run(run())
+
+    assert index.version == saved.version
+    assert index.skill_topic["s-flex"] == "t-css"
+    assert topics == CATALOG["topics"]
+    assert reloads == [True]
+    assert snapshot.snapshot_stats()["restoredVersion"] == saved.version
+
+
+class _FakeSnapshots:
+    def __init__(self):
+        self.docs = {}
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+
+def test_snapshot_round_trip_through_mongo(monkeypatch):
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT", "mongo")
+    monkeypatch.setattr(snapshot.db, "catalog_snapshots", _FakeSnapshots())
+    monkeypatch.setattr(snapshot, "state", {"version": None, "savedAt": None, "restoredVersion": None})
+    monkeypatch.setattr(snapshot, "catalog_cache", CatalogCache(ttl=60, stale_ttl=600, max_entries=8))
+    index = CatalogIndex()
+    monkeypatch.setattr(snapshot, "catalog_index", index)
+
+    saved = CatalogIndex().update(**CATALOG)
+
+    async def run():
+        await snapshot.save_snapshot(CATALOG, saved.version)
+        return await snapshot.restore_snapshot()
+
+    assert asyncio.run(run()) is True
+    assert index.version == saved.version
+
+
+def test_restore_without_snapshot_is_a_no_op(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT", "file")
+    monkeypatch.setattr(snapshot, "CATALOG_SNAPSHOT_PATH", str(tmp_path / "missing.json.gz"))
+
+    assert asyncio.run(snapshot.restore_snapshot()) is False